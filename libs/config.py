@@ -16,6 +16,9 @@ class Settings(BaseSettings):
     postgres_user: str = Field(default="finance", env="POSTGRES_USER")
     postgres_password: str = Field(default="finance", env="POSTGRES_PASSWORD")
 
+    # Redis
+    redis_url: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
+
     # FX
     fx_primary: str = Field(default="coingecko", env="FX_PRIMARY")
     ars_source: str = Field(default="blue", env="ARS_SOURCE")
@@ -1,16 +1,28 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
 
 from libs.db.config import settings
 
 Base = declarative_base()
 
+# Every process (Quart worker, bot, scripts) runs on a single event loop, so
+# pooled connections can be reused across requests.
 engine = create_async_engine(
     settings.database_url,
     echo=False,
-    poolclass=NullPool,  # Use NullPool to avoid event loop conflicts with Flask async
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_recycle=settings.db_pool_recycle,
+    pool_timeout=settings.db_pool_timeout,
+    query_cache_size=settings.db_query_cache_size,
+    connect_args={
+        # Short OLTP queries only; JIT compilation costs more than it saves
+        "server_settings": {"jit": "off"},
+        "timeout": settings.db_connect_timeout,
+        "command_timeout": settings.db_command_timeout,
+    },
 )
 
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
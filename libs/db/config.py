@@ -10,6 +10,16 @@ class Settings(BaseSettings):
     postgres_user: str = Field(default="finance", env="POSTGRES_USER")
     postgres_password: str = Field(default="finance", env="POSTGRES_PASSWORD")
 
+    # Connection pool
+    db_pool_size: int = Field(default=20, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=20, env="DB_MAX_OVERFLOW")
+    db_pool_pre_ping: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    db_pool_recycle: int = Field(default=1800, env="DB_POOL_RECYCLE")
+    db_pool_timeout: int = Field(default=30, env="DB_POOL_TIMEOUT")
+    db_connect_timeout: int = Field(default=10, env="DB_CONNECT_TIMEOUT")
+    db_command_timeout: int = Field(default=60, env="DB_COMMAND_TIMEOUT")
+    db_query_cache_size: int = Field(default=1200, env="DB_QUERY_CACHE_SIZE")
+
     @property
     def database_url(self) -> str:
         return f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
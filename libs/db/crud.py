@@ -1,8 +1,19 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
-
-from sqlalchemy import and_, desc, func, or_, select, update
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Row,
+    and_,
+    bindparam,
+    desc,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -21,6 +32,48 @@ from libs.db.models import (
 )
 
 
+# Signin only needs these columns; skips hydrating a full User
+_USER_CREDENTIALS_BY_EMAIL = select(
+    User.id, User.email, User.password, User.is_active
+).where(User.email == bindparam("email"))
+
+# Hot category/merchant statements are built once and reused with bound
+# parameters, so each call skips constructing and cache-keying a new select().
+_CATEGORY_ALL = (
+    select(Category)
+    .where(Category.user_id == bindparam("user_id"))
+    .order_by(Category.type, Category.name)
+)
+_CATEGORY_ROWS = (
+    select(Category.id, Category.name, Category.type, Category.created_at)
+    .where(Category.user_id == bindparam("user_id"))
+    .order_by(Category.type, Category.name)
+)
+_CATEGORY_BY_ID = select(Category).where(
+    and_(Category.id == bindparam("category_id"), Category.user_id == bindparam("user_id"))
+)
+_CATEGORY_BY_NAME = select(Category).where(
+    and_(Category.user_id == bindparam("user_id"), Category.name == bindparam("name"))
+)
+
+_MERCHANT_ALL = (
+    select(Merchant)
+    .where(Merchant.user_id == bindparam("user_id"))
+    .order_by(Merchant.name)
+)
+_MERCHANT_ROWS = (
+    select(Merchant.id, Merchant.name, Merchant.created_at)
+    .where(Merchant.user_id == bindparam("user_id"))
+    .order_by(Merchant.name)
+)
+_MERCHANT_BY_ID = select(Merchant).where(
+    and_(Merchant.id == bindparam("merchant_id"), Merchant.user_id == bindparam("user_id"))
+)
+_MERCHANT_BY_NAME = select(Merchant).where(
+    and_(Merchant.user_id == bindparam("user_id"), Merchant.name == bindparam("name"))
+)
+
+
 class UserCRUD:
     @staticmethod
     async def get_by_telegram_id(
@@ -31,6 +84,16 @@ class UserCRUD:
         )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_id_by_telegram_id(
+        session: AsyncSession, telegram_user_id: str
+    ) -> Optional[int]:
+        """Return only the user's id, without loading a User into the session."""
+        result = await session.execute(
+            select(User.id).where(User.telegram_user_id == telegram_user_id)
+        )
+        return result.scalar_one_or_none()
+
     @staticmethod
     async def create(
         session: AsyncSession,
@@ -86,6 +149,19 @@ class UserCRUD:
         )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_credentials_by_email(
+        session: AsyncSession, email: str
+    ) -> Optional[Row]:
+        """Return (id, email, password, is_active) for the user, if any."""
+        result = await session.execute(_USER_CREDENTIALS_BY_EMAIL, {"email": email})
+        return result.one_or_none()
+
+    @staticmethod
+    async def email_exists(session: AsyncSession, email: str) -> bool:
+        result = await session.execute(select(exists().where(User.email == email)))
+        return result.scalar()
+
     @staticmethod
     async def update_last_activity(session: AsyncSession, user_id: int) -> None:
         await session.execute(
@@ -247,15 +323,34 @@ class TransactionCRUD:
         return result.scalar_one()
 
     @staticmethod
-    async def get_by_date_range(
-        session: AsyncSession,
+    async def create_many(
+        session: AsyncSession, rows: List[Dict]
+    ) -> List[int]:
+        """Insert transaction rows in a single INSERT ... RETURNING.
+
+        Each row is a dict of Transaction column values. Returns the new ids;
+        relationships are not loaded.
+        """
+        if not rows:
+            return []
+
+        result = await session.scalars(
+            insert(Transaction).returning(Transaction.id),
+            rows,
+        )
+        ids = list(result)
+        await session.commit()
+        return ids
+
+    @staticmethod
+    def _date_range_query(
         user_id: int,
         start_date: datetime,
         end_date: datetime,
-        account_id: Optional[int] = None,
-        limit: Optional[int] = 10,
-        offset: Optional[int] = 0,
-    ) -> List[Transaction]:
+        account_id: Optional[int],
+        limit: Optional[int],
+        offset: Optional[int],
+    ):
         query = (
             select(Transaction)
             .where(
@@ -284,9 +379,43 @@ class TransactionCRUD:
                 )
             )
 
+        return query
+
+    @staticmethod
+    async def get_by_date_range(
+        session: AsyncSession,
+        user_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        account_id: Optional[int] = None,
+        limit: Optional[int] = 10,
+        offset: Optional[int] = 0,
+    ) -> List[Transaction]:
+        query = TransactionCRUD._date_range_query(
+            user_id, start_date, end_date, account_id, limit, offset
+        )
         result = await session.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    async def stream_by_date_range(
+        session: AsyncSession,
+        user_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        account_id: Optional[int] = None,
+        limit: Optional[int] = 10,
+        offset: Optional[int] = 0,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Transaction]:
+        """Like get_by_date_range, but fetches rows in batches of batch_size."""
+        query = TransactionCRUD._date_range_query(
+            user_id, start_date, end_date, account_id, limit, offset
+        ).execution_options(yield_per=batch_size)
+        result = await session.stream_scalars(query)
+        async for transaction in result:
+            yield transaction
+
     @staticmethod
     async def get_largest_in_period(
         session: AsyncSession,
@@ -469,21 +598,21 @@ class PendingTransactionCRUD:
 class CategoryCRUD:
     @staticmethod
     async def get_all(session: AsyncSession, user_id: int) -> List[Category]:
-        result = await session.execute(
-            select(Category)
-            .where(Category.user_id == user_id)
-            .order_by(Category.type, Category.name)
-        )
+        result = await session.execute(_CATEGORY_ALL, {"user_id": user_id})
         return result.scalars().all()
 
+    @staticmethod
+    async def get_all_rows(session: AsyncSession, user_id: int) -> List[Row]:
+        """Return (id, name, type, created_at) rows without ORM hydration."""
+        result = await session.execute(_CATEGORY_ROWS, {"user_id": user_id})
+        return result.all()
+
     @staticmethod
     async def get_by_id(
         session: AsyncSession, user_id: int, category_id: int
     ) -> Optional[Category]:
         result = await session.execute(
-            select(Category).where(
-                and_(Category.id == category_id, Category.user_id == user_id)
-            )
+            _CATEGORY_BY_ID, {"user_id": user_id, "category_id": category_id}
         )
         return result.scalar_one_or_none()
 
@@ -491,25 +620,66 @@ class CategoryCRUD:
     async def get_by_name(
         session: AsyncSession, user_id: int, name: str
     ) -> Optional[Category]:
+        result = await session.execute(
+            _CATEGORY_BY_NAME, {"user_id": user_id, "name": name}
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_many_by_names(
+        session: AsyncSession, user_id: int, names: List[str]
+    ) -> Dict[str, Category]:
+        """Resolve several category names in one query, keyed by name.
+
+        Callers resolving more than one name (bulk imports, batched
+        transaction creation) should use this instead of looping over
+        get_by_name.
+        """
+        if not names:
+            return {}
+
         result = await session.execute(
             select(Category).where(
-                and_(Category.user_id == user_id, Category.name == name)
+                and_(Category.user_id == user_id, Category.name.in_(names))
             )
         )
-        return result.scalar_one_or_none()
+        return {category.name: category for category in result.scalars()}
+
+    @staticmethod
+    async def create_many(
+        session: AsyncSession, user_id: int, categories: List[Tuple[str, str]]
+    ) -> List[Category]:
+        """Insert (name, type) pairs in a single INSERT ... RETURNING."""
+        if not categories:
+            return []
+
+        result = await session.scalars(
+            insert(Category).returning(Category),
+            [
+                {"user_id": user_id, "name": name, "type": category_type}
+                for name, category_type in categories
+            ],
+        )
+        created = list(result)
+        await session.commit()
+        return created
 
     @staticmethod
     async def create(
         session: AsyncSession, user_id: int, name: str, category_type: CategoryType
     ) -> Category:
-        category = Category(
-            user_id=user_id,
-            name=name,
-            type=category_type.value if isinstance(category_type, CategoryType) else category_type
+        # INSERT ... RETURNING populates created_at without a refresh SELECT
+        result = await session.execute(
+            insert(Category)
+            .values(
+                user_id=user_id,
+                name=name,
+                type=category_type.value if isinstance(category_type, CategoryType) else category_type
+            )
+            .returning(Category)
         )
-        session.add(category)
+        category = result.scalar_one()
         await session.commit()
-        await session.refresh(category)
         return category
 
     @staticmethod
@@ -524,10 +694,19 @@ class CategoryCRUD:
         if not category:
             return None
 
+        if category_type is not None:
+            category_type = category_type.value if isinstance(category_type, CategoryType) else category_type
+
+        # Nothing to change: skip the commit and refresh round-trips
+        if (name is None or name == category.name) and (
+            category_type is None or category_type == category.type
+        ):
+            return category
+
         if name is not None:
             category.name = name
         if category_type is not None:
-            category.type = category_type.value if isinstance(category_type, CategoryType) else category_type
+            category.type = category_type
 
         await session.commit()
         await session.refresh(category)
@@ -547,21 +726,21 @@ class CategoryCRUD:
 class MerchantCRUD:
     @staticmethod
     async def get_all(session: AsyncSession, user_id: int) -> List[Merchant]:
-        result = await session.execute(
-            select(Merchant)
-            .where(Merchant.user_id == user_id)
-            .order_by(Merchant.name)
-        )
+        result = await session.execute(_MERCHANT_ALL, {"user_id": user_id})
         return result.scalars().all()
 
+    @staticmethod
+    async def get_all_rows(session: AsyncSession, user_id: int) -> List[Row]:
+        """Return (id, name, created_at) rows without ORM hydration."""
+        result = await session.execute(_MERCHANT_ROWS, {"user_id": user_id})
+        return result.all()
+
     @staticmethod
     async def get_by_id(
         session: AsyncSession, user_id: int, merchant_id: int
     ) -> Optional[Merchant]:
         result = await session.execute(
-            select(Merchant).where(
-                and_(Merchant.id == merchant_id, Merchant.user_id == user_id)
-            )
+            _MERCHANT_BY_ID, {"user_id": user_id, "merchant_id": merchant_id}
         )
         return result.scalar_one_or_none()
 
@@ -570,9 +749,7 @@ class MerchantCRUD:
         session: AsyncSession, user_id: int, name: str
     ) -> Optional[Merchant]:
         result = await session.execute(
-            select(Merchant).where(
-                and_(Merchant.user_id == user_id, Merchant.name == name)
-            )
+            _MERCHANT_BY_NAME, {"user_id": user_id, "name": name}
         )
         return result.scalar_one_or_none()
 
@@ -580,10 +757,12 @@ class MerchantCRUD:
     async def create(
         session: AsyncSession, user_id: int, name: str
     ) -> Merchant:
-        merchant = Merchant(user_id=user_id, name=name)
-        session.add(merchant)
+        # INSERT ... RETURNING populates created_at without a refresh SELECT
+        result = await session.execute(
+            insert(Merchant).values(user_id=user_id, name=name).returning(Merchant)
+        )
+        merchant = result.scalar_one()
         await session.commit()
-        await session.refresh(merchant)
         return merchant
 
     @staticmethod
@@ -597,6 +776,10 @@ class MerchantCRUD:
         if not merchant:
             return None
 
+        # Nothing to change: skip the commit and refresh round-trips
+        if merchant.name == name:
+            return merchant
+
         merchant.name = name
         await session.commit()
         await session.refresh(merchant)
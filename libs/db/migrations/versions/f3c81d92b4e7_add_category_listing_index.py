@@ -0,0 +1,34 @@
+"""add_category_listing_index
+
+Revision ID: f3c81d92b4e7
+Revises: 6b49122464a2
+Create Date: 2026-10-16 10:12:41.218304
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f3c81d92b4e7"
+down_revision = "6b49122464a2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Lookups by (user_id, name) are already served by the uq_user_category_name
+    # and uq_user_merchant_name unique constraints, and merchants are listed by
+    # name so the same index covers their ordering. Categories are listed by
+    # (type, name), which needs its own composite index to avoid a sort.
+    op.create_index(
+        "ix_categories_user_type_name",
+        "categories",
+        ["user_id", "type", "name"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_categories_user_type_name", table_name="categories")
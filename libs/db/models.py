@@ -336,6 +336,7 @@ class Category(Base):
     __table_args__ = (
         UniqueConstraint("user_id", "name", name="uq_user_category_name"),
         Index("ix_categories_user_id", "user_id"),
+        Index("ix_categories_user_type_name", "user_id", "type", "name"),
     )
 
 
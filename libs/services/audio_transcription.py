@@ -5,18 +5,26 @@ This module provides transcription services using OpenAI's Whisper API
 for processing voice messages in the Financial Analysis Agent.
 """
 
+import asyncio
 import logging
 import os
-import tempfile
 from typing import Optional, TYPE_CHECKING
 import aiofiles
-import aiohttp
+import httpx
 
 if TYPE_CHECKING:
     from aiogram.types import Voice
 
 logger = logging.getLogger(__name__)
 
+# The Whisper API takes one file per request, so bursts of voice notes are
+# sent concurrently; this caps how many uploads are in flight at once so a
+# burst queues here instead of tripping OpenAI's rate limit.
+WHISPER_MAX_CONCURRENCY = int(os.getenv("WHISPER_MAX_CONCURRENCY", "8"))
+
+# Uploads can take a while for longer notes
+WHISPER_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
 
 class AudioTranscriptionService:
     """Service for transcribing audio messages to text."""
@@ -30,6 +38,17 @@ class AudioTranscriptionService:
         """
         self.api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         self.api_url = "https://api.openai.com/v1/audio/transcriptions"
+        self._slots = asyncio.Semaphore(WHISPER_MAX_CONCURRENCY)
+        # One pooled client for every upload, so voice notes after the first
+        # reuse the TLS connection to OpenAI (multiplexed over HTTP/2)
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=WHISPER_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=WHISPER_MAX_CONCURRENCY,
+                max_keepalive_connections=WHISPER_MAX_CONCURRENCY,
+            ),
+        )
 
         if not self.api_key:
             logger.warning(
@@ -49,6 +68,23 @@ class AudioTranscriptionService:
             voice_file_path: Path to the audio file
             language: Language hint for transcription (e.g., 'en', 'es')
 
+        Returns:
+            Transcribed text or None if transcription fails
+        """
+        async with aiofiles.open(voice_file_path, "rb") as audio_file:
+            audio_content = await audio_file.read()
+        return await self.transcribe_audio(audio_content, language)
+
+    async def transcribe_audio(
+        self, audio_content: bytes, language: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Transcribe in-memory OGG audio to text.
+
+        Args:
+            audio_content: Raw audio bytes
+            language: Language hint for transcription (e.g., 'en', 'es')
+
         Returns:
             Transcribed text or None if transcription fails
         """
@@ -56,69 +92,46 @@ class AudioTranscriptionService:
             logger.error("❌ Cannot transcribe audio: No OpenAI API key configured")
             return None
 
+        # Form fields
+        data = {"model": "whisper-1", "response_format": "text"}
+
+        # Add language hint if provided
+        if language:
+            data["language"] = language
+
+            # Add prompt to force Whisper to stay in the source language
+            # This prevents Whisper from translating Spanish -> English
+            if language == "es":
+                data["prompt"] = "Transcribir en español. Gasté pesos en el comercio."
+            elif language == "en":
+                data["prompt"] = "Transcribe in English. I spent dollars at the store."
+
         try:
-            async with aiohttp.ClientSession() as session:
-                # Prepare the form data
-                data = aiohttp.FormData()
-
-                # Add the audio file
-                async with aiofiles.open(voice_file_path, "rb") as audio_file:
-                    audio_content = await audio_file.read()
-                    data.add_field(
-                        "file",
-                        audio_content,
-                        filename="voice.ogg",
-                        content_type="audio/ogg",
+            # Make the API request
+            async with self._slots:
+                response = await self._client.post(
+                    self.api_url,
+                    data=data,
+                    files={"file": ("voice.ogg", audio_content, "audio/ogg")},
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                )
+
+            if response.status_code == 200:
+                transcription = response.text.strip()
+
+                if transcription:
+                    logger.info(
+                        f"✅ Audio transcribed successfully: '{transcription[:50]}...'"
                     )
-
-                # Add model parameter
-                data.add_field("model", "whisper-1")
-
-                # Add language hint if provided
-                if language:
-                    data.add_field("language", language)
-
-                    # Add prompt to force Whisper to stay in the source language
-                    # This prevents Whisper from translating Spanish -> English
-                    if language == "es":
-                        data.add_field(
-                            "prompt",
-                            "Transcribir en español. Gasté pesos en el comercio.",
-                        )
-                    elif language == "en":
-                        data.add_field(
-                            "prompt",
-                            "Transcribe in English. I spent dollars at the store.",
-                        )
-
-                # Add response format
-                data.add_field("response_format", "text")
-
-                # Prepare headers
-                headers = {"Authorization": f"Bearer {self.api_key}"}
-
-                # Make the API request
-                async with session.post(
-                    self.api_url, data=data, headers=headers
-                ) as response:
-                    if response.status == 200:
-                        transcription = await response.text()
-                        transcription = transcription.strip()
-
-                        if transcription:
-                            logger.info(
-                                f"✅ Audio transcribed successfully: '{transcription[:50]}...'"
-                            )
-                            return transcription
-                        else:
-                            logger.warning("⚠️ Transcription was empty")
-                            return None
-                    else:
-                        error_text = await response.text()
-                        logger.error(
-                            f"❌ Transcription API error {response.status}: {error_text}"
-                        )
-                        return None
+                    return transcription
+                else:
+                    logger.warning("⚠️ Transcription was empty")
+                    return None
+            else:
+                logger.error(
+                    f"❌ Transcription API error {response.status_code}: {response.text}"
+                )
+                return None
 
         except Exception as e:
             logger.error(f"❌ Error during audio transcription: {e}")
@@ -141,41 +154,20 @@ class AudioTranscriptionService:
         if not self.api_key:
             return None
 
-        temp_file = None
         try:
-            # Get file info from Telegram
-            file_info = await bot.get_file(voice.file_id)
-
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix=".ogg", delete=False) as temp_file:
-                temp_file_path = temp_file.name
-
-            # Download the file
-            await bot.download_file(file_info.file_path, temp_file_path)
+            # Voice notes are small; keep them in memory instead of a temp file
+            buffer = await bot.download(voice)
             logger.info(
                 f"📥 Downloaded voice message: {voice.duration}s, {voice.file_size} bytes"
             )
 
             # Transcribe the audio
-            transcription = await self.transcribe_voice_message(
-                temp_file_path, language
-            )
-
-            return transcription
+            return await self.transcribe_audio(buffer.getvalue(), language)
 
         except Exception as e:
             logger.error(f"❌ Error downloading/transcribing voice message: {e}")
             return None
 
-        finally:
-            # Clean up temporary file
-            if temp_file and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                    logger.debug("🗑️ Cleaned up temporary audio file")
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not delete temporary file: {e}")
-
 
 # Global instance
 audio_service = AudioTranscriptionService()
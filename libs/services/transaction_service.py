@@ -2,9 +2,10 @@
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from libs.db.base import async_session_maker
 from libs.db.crud import TransactionCRUD, PendingTransactionCRUD
 from libs.db.models import Transaction, TransactionType, PendingTransaction
 from libs.validators import validate_transaction_data, validate_date_range
@@ -420,12 +421,16 @@ class TransactionService:
         transaction_type: Optional[str] = None,
         limit: int = 10,
         offset: int = 0,
-    ) -> tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    ) -> tuple[Optional[AsyncIterator[Dict[str, Any]]], Optional[str]]:
         """
         List transactions for a user with filters.
 
+        Filters are validated up front. The rows themselves are streamed from a
+        session of their own, so they can be consumed after ``session`` has been
+        closed (e.g. while an HTTP response body is being sent).
+
         Args:
-            session: Database session
+            session: Database session, used to resolve the account
             user_id: User ID
             start_date: Start date for filter
             end_date: End date for filter
@@ -435,13 +440,20 @@ class TransactionService:
             offset: Number of transactions to skip
 
         Returns:
-            Tuple of (transactions_list, error_message)
+            Tuple of (transaction_rows, error_message)
         """
         # Validate date range
         is_valid, error = validate_date_range(start_date, end_date)
         if not is_valid:
             return None, error
 
+        tx_type = None
+        if transaction_type:
+            try:
+                tx_type = TransactionType(transaction_type.lower())
+            except ValueError:
+                return None, f"Invalid transaction type: {transaction_type}"
+
         # Get account ID if account name is provided
         account_id = None
         if account_name:
@@ -449,49 +461,62 @@ class TransactionService:
             if account:
                 account_id = account.id
 
-        # Get transactions
-        transactions = await TransactionCRUD.get_by_date_range(
-            session=session,
+        rows = TransactionService._stream_transaction_rows(
             user_id=user_id,
             start_date=start_date,
             end_date=end_date,
             account_id=account_id,
+            tx_type=tx_type,
             limit=limit,
             offset=offset,
         )
+        return rows, None
 
-        # Filter by type if specified
-        if transaction_type:
-            try:
-                tx_type = TransactionType(transaction_type.lower())
-                transactions = [t for t in transactions if t.type == tx_type]
-            except ValueError:
-                return None, f"Invalid transaction type: {transaction_type}"
-
-        # Convert to dict format
-        result = []
-        for tx in transactions:
-            result.append({
-                "id": tx.id,
-                "type": tx.type.value if hasattr(tx.type, 'value') else str(tx.type),
-                "amount": float(tx.amount),
-                "currency": tx.currency,
-                "account_from": tx.account_from.name if tx.account_from else None,
-                "account_to": tx.account_to.name if tx.account_to else None,
-                "category_id": tx.category_id,
-                "category": tx.category.name if tx.category else None,
-                "merchant_id": tx.merchant_id,
-                "merchant": tx.merchant.name if tx.merchant else None,
-                "is_necessary": tx.is_necessary,
-                "currency_to": tx.currency_to,
-                "amount_to": float(tx.amount_to) if tx.amount_to else None,
-                "exchange_rate": float(tx.exchange_rate) if tx.exchange_rate else None,
-                "description": tx.description,
-                "date": tx.date.isoformat(),
-                "created_at": tx.created_at.isoformat(),
-            })
-
-        return result, None
+    @staticmethod
+    async def _stream_transaction_rows(
+        user_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        account_id: Optional[int],
+        tx_type: Optional[TransactionType],
+        limit: int,
+        offset: int,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # Amounts, dates and the type (a plain str once loaded, possibly a
+        # TransactionType member) are left as-is; the API's orjson encoder
+        # serializes them.
+        async with async_session_maker() as session:
+            async for tx in TransactionCRUD.stream_by_date_range(
+                session=session,
+                user_id=user_id,
+                start_date=start_date,
+                end_date=end_date,
+                account_id=account_id,
+                limit=limit,
+                offset=offset,
+            ):
+                if tx_type is not None and tx.type != tx_type:
+                    continue
+
+                yield {
+                    "id": tx.id,
+                    "type": tx.type,
+                    "amount": tx.amount,
+                    "currency": tx.currency,
+                    "account_from": tx.account_from.name if tx.account_from else None,
+                    "account_to": tx.account_to.name if tx.account_to else None,
+                    "category_id": tx.category_id,
+                    "category": tx.category.name if tx.category else None,
+                    "merchant_id": tx.merchant_id,
+                    "merchant": tx.merchant.name if tx.merchant else None,
+                    "is_necessary": tx.is_necessary,
+                    "currency_to": tx.currency_to,
+                    "amount_to": tx.amount_to,
+                    "exchange_rate": tx.exchange_rate,
+                    "description": tx.description,
+                    "date": tx.date,
+                    "created_at": tx.created_at,
+                }
 
     @staticmethod
     async def get_transaction_by_id(
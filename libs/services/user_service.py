@@ -1,13 +1,33 @@
 """User service for authentication and user management."""
 
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import bcrypt
+from cachetools import TTLCache
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from libs.db.crud import UserCRUD
 from libs.db.models import User
 from libs.validators import validate_email, validate_password
 
+# 12 rounds in production; dev/staging can lower it to speed up signin
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt gets its own threads so a burst of signins can't starve the loop's
+# default executor (which also serves DNS lookups for new DB connections)
+_AUTH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="auth"
+)
+
+# Recent successful checks, keyed by a per-process keyed hash of
+# (stored hash, password) so a password change invalidates the entry
+_verified_passwords: TTLCache = TTLCache(maxsize=2000, ttl=60)
+_VERIFIED_PASSWORDS_KEY = os.urandom(16)
+
 
 class UserService:
     """Service for user-related operations."""
@@ -23,7 +43,7 @@ class UserService:
         Returns:
             Hashed password string
         """
-        salt = bcrypt.gensalt(rounds=12)  # 12 salt rounds (good balance of security/performance)
+        salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
         hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
         return hashed.decode("utf-8")
 
@@ -44,6 +64,37 @@ class UserService:
             hashed_password.encode("utf-8")
         )
 
+    @staticmethod
+    async def check_password(plain_password: str, hashed_password: str) -> bool:
+        """
+        Verify a password without blocking the event loop.
+
+        bcrypt runs on the auth thread pool. Successful checks are cached for a
+        minute so clients that re-authenticate often skip bcrypt.
+
+        Args:
+            plain_password: Plain text password
+            hashed_password: Hashed password from database
+
+        Returns:
+            True if password matches, False otherwise
+        """
+        cache_key = hashlib.blake2b(
+            f"{hashed_password}|{plain_password}".encode("utf-8"),
+            key=_VERIFIED_PASSWORDS_KEY,
+            digest_size=16,
+        ).digest()
+        if cache_key in _verified_passwords:
+            return True
+
+        loop = asyncio.get_running_loop()
+        is_valid = await loop.run_in_executor(
+            _AUTH_EXECUTOR, UserService.verify_password, plain_password, hashed_password
+        )
+        if is_valid:
+            _verified_passwords[cache_key] = True
+        return is_valid
+
     @staticmethod
     async def create_user(
         session: AsyncSession,
@@ -76,13 +127,15 @@ class UserService:
         # Normalize email
         email = email.strip().lower()
 
-        # Check if user already exists
-        existing_user = await UserCRUD.get_by_email(session=session, email=email)
-        if existing_user:
+        # Check if user already exists (EXISTS, no need to load the row)
+        if await UserCRUD.email_exists(session=session, email=email):
             return None, "User with this email already exists"
 
         # Hash password
-        hashed_password = UserService.hash_password(password)
+        loop = asyncio.get_running_loop()
+        hashed_password = await loop.run_in_executor(
+            _AUTH_EXECUTOR, UserService.hash_password, password
+        )
 
         # Create user
         user = await UserCRUD.create(
@@ -99,7 +152,7 @@ class UserService:
         session: AsyncSession,
         email: str,
         password: str,
-    ) -> tuple[Optional[User], Optional[str]]:
+    ) -> tuple[Optional[Row], Optional[str]]:
         """
         Authenticate a user with email and password.
 
@@ -109,16 +162,21 @@ class UserService:
             password: User password
 
         Returns:
-            Tuple of (user, error_message). If successful, user is not None and error is None.
+            Tuple of (user, error_message). If successful, user is a row with id,
+            email, password and is_active, and error is None.
         """
         # Normalize email
         email = email.strip().lower()
 
-        # Get user by email
-        user = await UserCRUD.get_by_email(session=session, email=email)
+        # Only the columns needed to authenticate
+        user = await UserCRUD.get_credentials_by_email(session=session, email=email)
 
         # Check if user exists and verify password
-        if user is None or not UserService.verify_password(password, user.password):
+        if (
+            user is None
+            or user.password is None  # Telegram-only account
+            or not await UserService.check_password(password, user.password)
+        ):
             return None, "Invalid email or password"
 
         # Check if user is active
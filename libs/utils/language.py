@@ -3,15 +3,20 @@ Language detection and localization utilities for bilingual financial assistant.
 """
 
 import re
+from functools import lru_cache
 from typing import Literal
 
 LanguageCode = Literal["en", "es"]
 
 
+@lru_cache(maxsize=8192)
 def detect_language(text: str) -> LanguageCode:
     """
     Detect if text is in Spanish or English.
     Returns 'es' for Spanish, 'en' for English (default).
+
+    Results are memoized: the bot re-detects the same short texts (commands,
+    language codes) on every message and button press.
     """
     text_lower = text.lower().strip()
 
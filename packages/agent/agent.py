@@ -1,3 +1,4 @@
+import asyncio
 import json
 from datetime import datetime
 from typing import List, Optional
@@ -70,8 +71,12 @@ class FinanceAgent:
 
                 self.user_language = detected_lang
 
-                # First, try to parse as transaction intent
-                transaction_intent = await self._extract_transaction_intent(message)
+                # Classify as transaction and as query concurrently; the
+                # transaction intent still takes precedence
+                transaction_intent, query_intent = await asyncio.gather(
+                    self._extract_transaction_intent(message),
+                    self._extract_query_intent(message),
+                )
                 if transaction_intent:
                     result = await self._handle_transaction(transaction_intent, user_id)
                     # Return tuple (confirmation_msg, transaction_data) for transactions
@@ -80,8 +85,7 @@ class FinanceAgent:
                     else:
                         return result, None
 
-                # Then try to parse as query intent
-                query_intent = await self._extract_query_intent(message)
+                # Then fall back to the query intent
                 if query_intent:
                     return await self._handle_query(query_intent, user_id), None
 
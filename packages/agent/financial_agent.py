@@ -83,6 +83,17 @@ class FinancialAnalysisAgent:
     def __init__(self):
         """Initialize the Financial Analysis Agent with category mappings and user memory."""
         self._category_mappings = self._build_category_mappings()
+        # Word-boundary pattern per keyword, compiled once instead of per expense
+        self._keyword_patterns = [
+            (
+                mapping,
+                [
+                    re.compile(r"\b" + re.escape(keyword) + r"\b", re.IGNORECASE)
+                    for keyword in mapping.keywords
+                ],
+            )
+            for mapping in self._category_mappings
+        ]
         self._user_memory: Dict[int, Dict[str, Any]] = {}
 
     def _build_category_mappings(self) -> List[CategoryMapping]:
@@ -346,7 +357,7 @@ class FinancialAnalysisAgent:
 
     async def process_expense_confirmation(
         self,
-        amount: float,
+        amount: Decimal,
         currency: str,
         date: Optional[datetime],
         merchant: str,
@@ -440,13 +451,12 @@ class FinancialAnalysisAgent:
         best_score = 0
         keyword_matches = 0
 
-        for mapping in self._category_mappings:
+        for mapping, patterns in self._keyword_patterns:
             score = 0
             matches = 0
-            for keyword in mapping.keywords:
-                # Use word boundaries to avoid partial matches like "tax" in "Starbucks"
-                pattern = r"\b" + re.escape(keyword) + r"\b"
-                if re.search(pattern, combined_text, re.IGNORECASE):
+            for pattern in patterns:
+                # Word boundaries avoid partial matches like "tax" in "Starbucks"
+                if pattern.search(combined_text):
                     score += 1
                     matches += 1
 
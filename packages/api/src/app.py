@@ -1,11 +1,20 @@
-"""Main Flask application for expense tracker API."""
+"""Main Quart application for expense tracker API."""
 
-from datetime import datetime, timedelta
+import asyncio
+import hashlib
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
 import os
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-from flask_jwt_extended import (
-    JWTManager,
+import orjson
+from quart import Quart, g, request
+from quart.json.provider import JSONProvider
+from quart_cors import cors
+
+from packages.api.src.schemas import (
+    account_list_out,
+    encoder as schema_encoder,
+)
+from packages.api.src.middleware.auth import (
     create_access_token,
     jwt_required,
     get_jwt_identity,
@@ -16,10 +25,38 @@ from libs.services.user_service import UserService
 from libs.services.transaction_service import TransactionService
 from libs.services.account_service import AccountService
 from libs.db.crud import TransactionCRUD
-from libs.db.models import TransactionType
+from libs.db.models import CategoryType, TransactionType
+
+
+def _orjson_default(obj):
+    """Encode Decimals as exact JSON numbers instead of going through float."""
+    if isinstance(obj, Decimal):
+        return orjson.Fragment(str(obj))
+    raise TypeError
+
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson.
+
+    Covers everything that goes through ``app.json``: ``jsonify``, dicts
+    returned from views, and ``request.get_json()``.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_orjson_default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_orjson_default), mimetype="application/json"
+        )
 
 
-app = Flask(__name__)
+app = Quart(__name__)
+app.json = OrjsonProvider(app)
 
 # CORS Configuration
 # Get allowed origins from environment or use defaults
@@ -38,14 +75,13 @@ all_origins = list(set(default_origins + [origin.strip() for origin in allowed_o
 print(f"CORS allowed origins: {all_origins}")
 print(f"CORS_ORIGINS env var: {os.getenv('CORS_ORIGINS')}")
 
-CORS(app, resources={
-    r"/*": {
-        "origins": all_origins,
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"],
-        "supports_credentials": True,
-    }
-})
+app = cors(
+    app,
+    allow_origin=all_origins,
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
+    allow_credentials=True,
+)
 
 # JWT Configuration
 app.config["JWT_SECRET_KEY"] = os.getenv(
@@ -53,26 +89,150 @@ app.config["JWT_SECRET_KEY"] = os.getenv(
 )
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
 
-# Initialize JWT Manager
-jwt = JWTManager(app)
+
+@app.before_request
+async def open_db_session():
+    """Give the request one AsyncSession as ``g.db``.
+
+    Every CRUD call made while handling the request shares the session. No
+    connection is checked out from the pool until the first query runs.
+    """
+    g.db = async_session_maker()
+
+
+@app.teardown_request
+async def close_db_session(exc):
+    """Close the request's session and return its connection to the pool."""
+    session = g.pop("db", None)
+    if session is not None:
+        await session.close()
+
+
+async def _read_json():
+    """Parse the request body with orjson straight from bytes.
+
+    Skips the str decode request.get_json() does. An empty body reads as an
+    empty object; malformed JSON is a 400, as with get_json().
+    """
+    body = await request.get_data(cache=False)
+    if not body:
+        return {}
+    try:
+        return orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        return request.on_json_loading_failed(e)
+
+
+async def _in_own_session(query, *args):
+    """Run a read-only CRUD call on a short-lived session of its own.
+
+    Lets a handler run several queries concurrently with asyncio.gather.
+    """
+    async with async_session_maker() as session:
+        return await query(session, *args)
+
+
+def _json_response(payload, status: int = 200):
+    """Build a JSON response encoded with orjson."""
+    return app.response_class(
+        orjson.dumps(payload, default=_orjson_default),
+        status=status,
+        mimetype="application/json",
+    )
+
+
+def _conditional_json_response(body: bytes):
+    """Wrap an encoded JSON body with an ETag, or send a bare 304 if the client has it.
+
+    The ETag is a hash of the encoded body rather than a write counter: account
+    and balance data also changes through the Telegram bot, which runs in
+    another process, and the API itself runs several workers.
+    """
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+_NOON_UTC = time(12, tzinfo=timezone.utc)
+
+
+def _parse_transaction_date(value: str) -> datetime:
+    """Parse a transaction date sent by a client.
+
+    Date-only strings (YYYY-MM-DD) are treated as noon UTC so the date can't
+    shift across timezone conversions. Anything else is parsed as ISO 8601;
+    fromisoformat accepts a trailing 'Z' on Python 3.11+.
+    """
+    if len(value) == 10 and "T" not in value:
+        return datetime.combine(date.fromisoformat(value), _NOON_UTC)
+    return datetime.fromisoformat(value)
+
+
+_VALID_CATEGORY_TYPES = frozenset(t.value for t in CategoryType)
+
+# Static error bodies, encoded once at import
+_ERR_EMAIL_PASSWORD_REQUIRED = orjson.dumps({"error": "email and password are required"})
+_ERR_TELEGRAM_NOT_CONFIGURED = orjson.dumps({"error": "Telegram bot not configured"})
+_ERR_INVALID_TELEGRAM_AUTH = orjson.dumps({"error": "Invalid Telegram authentication"})
+_ERR_TELEGRAM_AUTH_TOO_OLD = orjson.dumps({"error": "Authentication data is too old"})
+_ERR_NAME_TYPE_REQUIRED = orjson.dumps({"error": "name and type are required"})
+_ERR_ACCOUNT_NOT_FOUND = orjson.dumps({"error": "Account not found"})
+_ERR_DATE_RANGE_REQUIRED = orjson.dumps({"error": "date_from and date_to are required"})
+_ERR_INVALID_DATETIME_FORMAT = orjson.dumps(
+    {"error": "Invalid date format. Use ISO format (e.g., 2024-01-01T12:00:00)"}
+)
+_ERR_TRANSACTION_FIELDS_REQUIRED = orjson.dumps(
+    {"error": "transaction_type, amount, and currency are required"}
+)
+_ERR_INVALID_DATE_FORMAT = orjson.dumps(
+    {"error": "Invalid date format. Use ISO format (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)"}
+)
+_ERR_TRANSACTION_NOT_FOUND = orjson.dumps({"error": "Transaction not found"})
+_ERR_INVALID_DATE = orjson.dumps({"error": "Invalid date format"})
+_ERR_INVALID_CATEGORY_TYPE = orjson.dumps({"error": "type must be 'income' or 'expense'"})
+_ERR_CATEGORY_EXISTS = orjson.dumps({"error": "Category with this name already exists"})
+_ERR_CATEGORY_NOT_FOUND = orjson.dumps({"error": "Category not found"})
+_ERR_CATEGORIES_REQUIRED = orjson.dumps({"error": "categories must be a non-empty list"})
+_ERR_NAME_REQUIRED = orjson.dumps({"error": "name is required"})
+_ERR_MERCHANT_EXISTS = orjson.dumps({"error": "Merchant with this name already exists"})
+_ERR_MERCHANT_NOT_FOUND = orjson.dumps({"error": "Merchant not found"})
+_ERR_TELEGRAM_ID_REQUIRED = orjson.dumps({"error": "telegram_user_id is required"})
+_ERR_TELEGRAM_ALREADY_LINKED = orjson.dumps(
+    {"error": "This Telegram account is already linked to another user"}
+)
+
+
+def _static_response(body: bytes, status: int):
+    """Wrap a pre-encoded JSON body in a fresh response.
+
+    A new response object is built per request because after_request hooks
+    (e.g. CORS) set per-request headers on it.
+    """
+    return app.response_class(body, status=status, mimetype="application/json")
 
 
 # ==================== Health Check ====================
 
 @app.route("/health", methods=["GET"])
-def get_health():
+async def get_health():
     """Health check endpoint."""
-    return jsonify({"healthy": True, "timestamp": datetime.now().isoformat()})
+    return _json_response({"healthy": True, "timestamp": datetime.now()})
 
 
 @app.route("/test-cors", methods=["GET", "POST", "OPTIONS"])
-def test_cors():
+async def test_cors():
     """Test endpoint to verify CORS is working."""
     print(f"=== TEST CORS ENDPOINT HIT ===")
     print(f"Method: {request.method}")
     print(f"Origin: {request.headers.get('Origin')}")
     print(f"Headers: {dict(request.headers)}")
-    return jsonify({"message": "CORS test successful", "method": request.method})
+    return _json_response({"message": "CORS test successful", "method": request.method})
 
 
 # ==================== Authentication ====================
@@ -89,35 +249,35 @@ async def signin():
     Returns:
         - access_token: JWT token for authentication
     """
-    data = request.get_json()
+    data = await _read_json()
     email = data.get("email")
     password = data.get("password")
 
     if not email or not password:
-        return jsonify({"error": "email and password are required"}), 400
-
-    async with async_session_maker() as session:
-        user, error = await UserService.authenticate_user(
-            session=session,
-            email=email,
-            password=password,
-        )
-
-        if error:
-            return jsonify({"error": error}), 401
-
-        access_token = create_access_token(
-            identity=str(user.id),
-            additional_claims={"email": user.email}
-        )
-
-        return jsonify({
-            "access_token": access_token,
-            "user": {
-                "id": user.id,
-                "email": user.email,
-            }
-        }), 200
+        return _static_response(_ERR_EMAIL_PASSWORD_REQUIRED, 400)
+
+    session = g.db
+    user, error = await UserService.authenticate_user(
+        session=session,
+        email=email,
+        password=password,
+    )
+
+    if error:
+        return _json_response({"error": error}, 401)
+
+    access_token = create_access_token(
+        identity=user.id,
+        additional_claims={"email": user.email}
+    )
+
+    return _json_response({
+        "access_token": access_token,
+        "user": {
+            "id": user.id,
+            "email": user.email,
+        }
+    })
 
 
 @app.route("/signup", methods=["POST"])
@@ -134,39 +294,39 @@ async def signup():
         - access_token: JWT token for authentication
         - user: User information
     """
-    data = request.get_json()
+    data = await _read_json()
     email = data.get("email")
     password = data.get("password")
     language_code = data.get("language_code")
 
     if not email or not password:
-        return jsonify({"error": "email and password are required"}), 400
-
-    async with async_session_maker() as session:
-        user, error = await UserService.create_user(
-            session=session,
-            email=email,
-            password=password,
-            language_code=language_code,
-        )
-
-        if error:
-            return jsonify({"error": error}), 400
-
-        # Generate access token for the new user
-        access_token = create_access_token(
-            identity=str(user.id),
-            additional_claims={"email": user.email}
-        )
-
-        return jsonify({
-            "message": "User created successfully",
-            "access_token": access_token,
-            "user": {
-                "id": user.id,
-                "email": user.email,
-            }
-        }), 201
+        return _static_response(_ERR_EMAIL_PASSWORD_REQUIRED, 400)
+
+    session = g.db
+    user, error = await UserService.create_user(
+        session=session,
+        email=email,
+        password=password,
+        language_code=language_code,
+    )
+
+    if error:
+        return _json_response({"error": error}, 400)
+
+    # Generate access token for the new user
+    access_token = create_access_token(
+        identity=user.id,
+        additional_claims={"email": user.email}
+    )
+
+    return _json_response({
+        "message": "User created successfully",
+        "access_token": access_token,
+        "user": {
+            "id": user.id,
+            "email": user.email,
+        }
+    }, 201)
 
 
 @app.route("/auth/telegram", methods=["POST"])
@@ -188,12 +348,11 @@ async def telegram_auth():
         - user: User information
         - is_new_user: Boolean indicating if this is a new registration
     """
-    import hashlib
     import hmac
 
     print("=== Telegram Auth Request Started ===")
 
-    data = request.get_json()
+    data = await _read_json()
     print(f"Received data: {data}")
 
     # Extract Telegram data
@@ -219,13 +378,13 @@ async def telegram_auth():
 
         error_msg = f"Missing required Telegram authentication data: {', '.join(missing_fields)}"
         print(f"ERROR: {error_msg}")
-        return jsonify({"error": error_msg}), 400
+        return _json_response({"error": error_msg}, 400)
 
     # Verify Telegram authentication (security check)
     bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
     if not bot_token:
         print("ERROR: TELEGRAM_BOT_TOKEN environment variable not set")
-        return jsonify({"error": "Telegram bot not configured"}), 500
+        return _static_response(_ERR_TELEGRAM_NOT_CONFIGURED, 500)
 
     print(f"Bot token configured (length: {len(bot_token)})")
 
@@ -256,7 +415,7 @@ async def telegram_auth():
     # Verify hash
     if calculated_hash != hash_value:
         print("ERROR: Hash verification failed - invalid Telegram authentication")
-        return jsonify({"error": "Invalid Telegram authentication"}), 401
+        return _static_response(_ERR_INVALID_TELEGRAM_AUTH, 401)
 
     print("Hash verification successful")
 
@@ -268,76 +427,76 @@ async def telegram_auth():
 
     if auth_age > 86400:  # 24 hours
         print(f"ERROR: Authentication data is too old ({auth_age} seconds)")
-        return jsonify({"error": "Authentication data is too old"}), 401
+        return _static_response(_ERR_TELEGRAM_AUTH_TOO_OLD, 401)
 
     print("Auth timestamp validation successful")
 
-    async with async_session_maker() as session:
-        print(f"Looking up user by telegram_id: {telegram_id}")
-
-        # Check if user exists
-        user = await UserService.get_user_by_telegram_id(session, telegram_id)
-        is_new_user = user is None
-
-        print(f"User lookup result - is_new_user: {is_new_user}, user found: {user is not None}")
-
-        if not user:
-            print(f"Creating new user - telegram_id: {telegram_id}, first_name: {first_name}, last_name: {last_name}, username: {username}")
-
-            # Create new user with Telegram data
-            from libs.db.crud import UserCRUD
-            try:
-                user = await UserCRUD.create(
-                    session=session,
-                    telegram_user_id=telegram_id,
-                    first_name=first_name,
-                    last_name=last_name,
-                    username=username,
-                )
-                print(f"User created successfully - user_id: {user.id}")
-            except Exception as e:
-                print(f"ERROR creating user: {str(e)}")
-                print(f"Exception type: {type(e).__name__}")
-                import traceback
-                traceback.print_exc()
-                return jsonify({"error": f"Failed to create user: {str(e)}"}), 500
-        else:
-            print(f"Existing user found - user_id: {user.id}, telegram_id: {user.telegram_user_id}")
-
-        # Generate access token
-        print(f"Generating access token for user_id: {user.id}")
+    session = g.db
+    print(f"Looking up user by telegram_id: {telegram_id}")
+
+    # Check if user exists
+    user = await UserService.get_user_by_telegram_id(session, telegram_id)
+    is_new_user = user is None
+
+    print(f"User lookup result - is_new_user: {is_new_user}, user found: {user is not None}")
+
+    if not user:
+        print(f"Creating new user - telegram_id: {telegram_id}, first_name: {first_name}, last_name: {last_name}, username: {username}")
+
+        # Create new user with Telegram data
+        from libs.db.crud import UserCRUD
         try:
-            access_token = create_access_token(
-                identity=str(user.id),
-                additional_claims={
-                    "telegram_id": user.telegram_user_id,
-                    "email": user.email
-                }
+            user = await UserCRUD.create(
+                session=session,
+                telegram_user_id=telegram_id,
+                first_name=first_name,
+                last_name=last_name,
+                username=username,
             )
-            print("Access token generated successfully")
+            print(f"User created successfully - user_id: {user.id}")
         except Exception as e:
-            print(f"ERROR generating access token: {str(e)}")
+            print(f"ERROR creating user: {str(e)}")
+            print(f"Exception type: {type(e).__name__}")
             import traceback
             traceback.print_exc()
-            return jsonify({"error": f"Failed to generate token: {str(e)}"}), 500
-
-        response_data = {
-            "access_token": access_token,
-            "user": {
-                "id": user.id,
-                "telegram_user_id": user.telegram_user_id,
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "username": user.username,
-                "email": user.email,
-            },
-            "is_new_user": is_new_user
-        }
+            return _json_response({"error": f"Failed to create user: {str(e)}"}, 500)
+    else:
+        print(f"Existing user found - user_id: {user.id}, telegram_id: {user.telegram_user_id}")
+
+    # Generate access token
+    print(f"Generating access token for user_id: {user.id}")
+    try:
+        access_token = create_access_token(
+            identity=user.id,
+            additional_claims={
+                "telegram_id": user.telegram_user_id,
+                "email": user.email
+            }
+        )
+        print("Access token generated successfully")
+    except Exception as e:
+        print(f"ERROR generating access token: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return _json_response({"error": f"Failed to generate token: {str(e)}"}, 500)
+
+    response_data = {
+        "access_token": access_token,
+        "user": {
+            "id": user.id,
+            "telegram_user_id": user.telegram_user_id,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "username": user.username,
+            "email": user.email,
+        },
+        "is_new_user": is_new_user
+    }
 
-        print(f"Telegram auth successful - returning response for user_id: {user.id}, is_new_user: {is_new_user}")
-        print("=== Telegram Auth Request Completed Successfully ===")
+    print(f"Telegram auth successful - returning response for user_id: {user.id}, is_new_user: {is_new_user}")
+    print("=== Telegram Auth Request Completed Successfully ===")
 
-        return jsonify(response_data), 200
+    return _json_response(response_data)
 
 
 # ==================== Accounts ====================
@@ -354,42 +513,18 @@ async def list_accounts():
     Returns:
         - accounts: List of accounts with optional balance information
     """
-    current_user_id = int(get_jwt_identity())
+    current_user_id = get_jwt_identity()
     include_balances = request.args.get("include_balances", "true").lower() == "true"
 
-    async with async_session_maker() as session:
-        accounts = await AccountService.list_accounts(
-            session=session,
-            user_id=current_user_id,
-            include_balances=include_balances,
-        )
-
-        result = []
-        for account in accounts:
-            account_data = {
-                "id": account.id,
-                "name": account.name,
-                "type": account.type,
-                "track_balance": account.track_balance,
-                "created_at": account.created_at.isoformat(),
-            }
-
-            if include_balances and hasattr(account, 'balances'):
-                account_data["balances"] = [
-                    {
-                        "currency": balance.currency,
-                        "balance": float(balance.balance),
-                        "updated_at": balance.updated_at.isoformat(),
-                    }
-                    for balance in account.balances
-                ]
-
-            result.append(account_data)
+    session = g.db
+    accounts = await AccountService.list_accounts(
+        session=session,
+        user_id=current_user_id,
+        include_balances=include_balances,
+    )
 
-        return jsonify({
-            "accounts": result,
-            "count": len(result),
-        }), 200
+    payload = account_list_out(accounts, include_balances)
+    return _conditional_json_response(schema_encoder.encode(payload))
 
 
 @app.route("/accounts", methods=["POST"])
@@ -406,35 +541,35 @@ async def create_account():
     Returns:
         - account: Created account information
     """
-    current_user_id = int(get_jwt_identity())
-    data = request.get_json()
+    current_user_id = get_jwt_identity()
+    data = await _read_json()
 
     name = data.get("name")
     account_type = data.get("type")
     track_balance = data.get("track_balance")
 
     if not name or not account_type:
-        return jsonify({"error": "name and type are required"}), 400
+        return _static_response(_ERR_NAME_TYPE_REQUIRED, 400)
 
-    async with async_session_maker() as session:
-        account, error = await AccountService.create_account(
-            session=session,
-            user_id=current_user_id,
-            name=name,
-            account_type=account_type,
-            track_balance=track_balance,
-        )
+    session = g.db
+    account, error = await AccountService.create_account(
+        session=session,
+        user_id=current_user_id,
+        name=name,
+        account_type=account_type,
+        track_balance=track_balance,
+    )
 
-        if error:
-            return jsonify({"error": error}), 400
+    if error:
+        return _json_response({"error": error}, 400)
 
-        return jsonify({
-            "id": account.id,
-            "name": account.name,
-            "type": account.type,
-            "track_balance": account.track_balance,
-            "created_at": account.created_at.isoformat(),
-        }), 201
+    return _json_response({
+        "id": account.id,
+        "name": account.name,
+        "type": account.type,
+        "track_balance": account.track_balance,
+        "created_at": account.created_at,
+    }, 201)
 
 
 @app.route("/accounts/<int:account_id>", methods=["PUT"])
@@ -454,48 +589,48 @@ async def update_account(account_id: int):
     Returns:
         - account: Updated account information
     """
-    current_user_id = int(get_jwt_identity())
-    data = request.get_json()
-
-    async with async_session_maker() as session:
-        from sqlalchemy import select, update
-        from libs.db.models import Account
-
-        # Verify account exists and belongs to user
-        result = await session.execute(
-            select(Account).where(
-                Account.id == account_id,
-                Account.user_id == current_user_id
-            )
+    current_user_id = get_jwt_identity()
+    data = await _read_json()
+
+    session = g.db
+    from sqlalchemy import select, update
+    from libs.db.models import Account
+
+    # Verify account exists and belongs to user
+    result = await session.execute(
+        select(Account).where(
+            Account.id == account_id,
+            Account.user_id == current_user_id
         )
-        account = result.scalar_one_or_none()
-
-        if not account:
-            return jsonify({"error": "Account not found"}), 404
-
-        # Update fields if provided
-        update_data = {}
-        if "name" in data:
-            update_data["name"] = data["name"]
-        if "type" in data:
-            update_data["type"] = data["type"]
-        if "track_balance" in data:
-            update_data["track_balance"] = data["track_balance"]
-
-        if update_data:
-            await session.execute(
-                update(Account).where(Account.id == account_id).values(**update_data)
-            )
-            await session.commit()
-            await session.refresh(account)
+    )
+    account = result.scalar_one_or_none()
+
+    if not account:
+        return _static_response(_ERR_ACCOUNT_NOT_FOUND, 404)
+
+    # Update fields if provided
+    update_data = {}
+    if "name" in data:
+        update_data["name"] = data["name"]
+    if "type" in data:
+        update_data["type"] = data["type"]
+    if "track_balance" in data:
+        update_data["track_balance"] = data["track_balance"]
+
+    if update_data:
+        await session.execute(
+            update(Account).where(Account.id == account_id).values(**update_data)
+        )
+        await session.commit()
+        await session.refresh(account)
 
-        return jsonify({
-            "id": account.id,
-            "name": account.name,
-            "type": account.type,
-            "track_balance": account.track_balance,
-            "created_at": account.created_at.isoformat(),
-        }), 200
+    return _json_response({
+        "id": account.id,
+        "name": account.name,
+        "type": account.type,
+        "track_balance": account.track_balance,
+        "created_at": account.created_at,
+    })
 
 
 @app.route("/accounts/<int:account_id>", methods=["DELETE"])
@@ -510,31 +645,31 @@ async def delete_account(account_id: int):
     Returns:
         - message: Success message
     """
-    current_user_id = int(get_jwt_identity())
+    current_user_id = get_jwt_identity()
 
-    async with async_session_maker() as session:
-        from sqlalchemy import select, delete
-        from libs.db.models import Account
-
-        # Verify account exists and belongs to user
-        result = await session.execute(
-            select(Account).where(
-                Account.id == account_id,
-                Account.user_id == current_user_id
-            )
+    session = g.db
+    from sqlalchemy import select, delete
+    from libs.db.models import Account
+
+    # Verify account exists and belongs to user
+    result = await session.execute(
+        select(Account).where(
+            Account.id == account_id,
+            Account.user_id == current_user_id
         )
-        account = result.scalar_one_or_none()
+    )
+    account = result.scalar_one_or_none()
 
-        if not account:
-            return jsonify({"error": "Account not found"}), 404
+    if not account:
+        return _static_response(_ERR_ACCOUNT_NOT_FOUND, 404)
 
-        # Delete the account
-        await session.execute(
-            delete(Account).where(Account.id == account_id)
-        )
-        await session.commit()
+    # Delete the account
+    await session.execute(
+        delete(Account).where(Account.id == account_id)
+    )
+    await session.commit()
 
-        return jsonify({"message": "Account deleted successfully"}), 200
+    return _json_response({"message": "Account deleted successfully"})
 
 
 @app.route("/accounts/balances", methods=["GET"])
@@ -549,20 +684,20 @@ async def get_balances():
     Returns:
         - balances: List of account balances
     """
-    current_user_id = int(get_jwt_identity())
+    current_user_id = get_jwt_identity()
     account_name = request.args.get("account_name")
 
-    async with async_session_maker() as session:
-        balances = await AccountService.get_all_balances(
-            session=session,
-            user_id=current_user_id,
-            account_name=account_name,
-        )
+    session = g.db
+    balances = await AccountService.get_all_balances(
+        session=session,
+        user_id=current_user_id,
+        account_name=account_name,
+    )
 
-        return jsonify({
-            "balances": balances,
-            "count": len(balances),
-        }), 200
+    return _conditional_json_response(orjson.dumps(
+        {"balances": balances, "count": len(balances)},
+        default=_orjson_default,
+    ))
 
 
 # ==================== Transactions ====================
@@ -585,7 +720,7 @@ async def list_transactions():
         - transactions: List of transactions
         - count: Number of transactions returned
     """
-    current_user_id = int(get_jwt_identity())
+    current_user_id = get_jwt_identity()
 
     # Parse query parameters
     date_from_str = request.args.get("date_from")
@@ -597,34 +732,42 @@ async def list_transactions():
 
     # Validate required parameters
     if not date_from_str or not date_to_str:
-        return jsonify({"error": "date_from and date_to are required"}), 400
+        return _static_response(_ERR_DATE_RANGE_REQUIRED, 400)
 
     # Parse dates
     try:
-        date_from = datetime.fromisoformat(date_from_str.replace('Z', '+00:00'))
-        date_to = datetime.fromisoformat(date_to_str.replace('Z', '+00:00'))
+        date_from = datetime.fromisoformat(date_from_str)
+        date_to = datetime.fromisoformat(date_to_str)
     except ValueError:
-        return jsonify({"error": "Invalid date format. Use ISO format (e.g., 2024-01-01T12:00:00)"}), 400
-
-    async with async_session_maker() as session:
-        transactions, error = await TransactionService.list_transactions(
-            session=session,
-            user_id=current_user_id,
-            start_date=date_from,
-            end_date=date_to,
-            account_name=account_name,
-            transaction_type=transaction_type,
-            limit=limit,
-            offset=offset,
-        )
-
-        if error:
-            return jsonify({"error": error}), 400
-
-        return jsonify({
-            "transactions": transactions,
-            "count": len(transactions),
-        }), 200
+        return _static_response(_ERR_INVALID_DATETIME_FORMAT, 400)
+
+    session = g.db
+    rows, error = await TransactionService.list_transactions(
+        session=session,
+        user_id=current_user_id,
+        start_date=date_from,
+        end_date=date_to,
+        account_name=account_name,
+        transaction_type=transaction_type,
+        limit=limit,
+        offset=offset,
+    )
+
+    if error:
+        return _json_response({"error": error}, 400)
+
+    # Stream the array row by row so memory stays flat for large pages
+    async def body():
+        yield b'{"transactions":['
+        count = 0
+        async for row in rows:
+            if count:
+                yield b","
+            yield orjson.dumps(row, default=_orjson_default)
+            count += 1
+        yield b'],"count":%d}' % count
+
+    return app.response_class(body(), mimetype="application/json")
 
 
 @app.route("/transactions", methods=["POST"])
@@ -648,8 +791,8 @@ async def create_transaction():
     Returns:
         - transaction: Created transaction information
     """
-    current_user_id = int(get_jwt_identity())
-    data = request.get_json()
+    current_user_id = get_jwt_identity()
+    data = await _read_json()
 
     # Extract required fields
     transaction_type = data.get("transaction_type")
@@ -667,59 +810,52 @@ async def create_transaction():
 
     # Validate required fields
     if not all([transaction_type, amount, currency]):
-        return jsonify({"error": "transaction_type, amount, and currency are required"}), 400
+        return _static_response(_ERR_TRANSACTION_FIELDS_REQUIRED, 400)
 
     # Parse date if provided
     date = None
     if date_str:
         try:
-            # Handle date-only strings (YYYY-MM-DD) by treating them as noon UTC
-            # This prevents timezone conversion issues where the date might shift
-            if len(date_str) == 10 and 'T' not in date_str:
-                # Date-only format, use noon UTC to avoid date boundary issues
-                date = datetime.fromisoformat(date_str + 'T12:00:00+00:00')
-            else:
-                # Full datetime format
-                date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+            date = _parse_transaction_date(date_str)
         except ValueError:
-            return jsonify({"error": "Invalid date format. Use ISO format (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)"}), 400
-
-    async with async_session_maker() as session:
-        transaction, error = await TransactionService.create_transaction(
-            session=session,
-            user_id=current_user_id,
-            transaction_type=transaction_type,
-            amount=amount,
-            currency=currency,
-            date=date,
-            account_from=account_from,
-            account_to=account_to,
-            currency_to=currency_to,
-            amount_to=amount_to,
-            exchange_rate=exchange_rate,
-            description=description,
-        )
-
-        if error:
-            # Check if it's a queued transaction (informational message, not an error)
-            if "queued" in error.lower():
-                return jsonify({"message": error, "status": "queued"}), 202
-            return jsonify({"error": error}), 400
-
-        return jsonify({
-            "id": transaction.id,
-            "type": transaction.type.value if hasattr(transaction.type, 'value') else str(transaction.type),
-            "amount": float(transaction.amount),
-            "currency": transaction.currency,
-            "account_from": transaction.account_from.name if transaction.account_from else None,
-            "account_to": transaction.account_to.name if transaction.account_to else None,
-            "currency_to": transaction.currency_to,
-            "amount_to": float(transaction.amount_to) if transaction.amount_to else None,
-            "exchange_rate": float(transaction.exchange_rate) if transaction.exchange_rate else None,
-            "description": transaction.description,
-            "date": transaction.date.isoformat(),
-            "created_at": transaction.created_at.isoformat(),
-        }), 201
+            return _static_response(_ERR_INVALID_DATE_FORMAT, 400)
+
+    session = g.db
+    transaction, error = await TransactionService.create_transaction(
+        session=session,
+        user_id=current_user_id,
+        transaction_type=transaction_type,
+        amount=amount,
+        currency=currency,
+        date=date,
+        account_from=account_from,
+        account_to=account_to,
+        currency_to=currency_to,
+        amount_to=amount_to,
+        exchange_rate=exchange_rate,
+        description=description,
+    )
+
+    if error:
+        # Check if it's a queued transaction (informational message, not an error)
+        if "queued" in error.lower():
+            return _json_response({"message": error, "status": "queued"}, 202)
+        return _json_response({"error": error}, 400)
+
+    return _json_response({
+        "id": transaction.id,
+        "type": transaction.type,
+        "amount": transaction.amount,
+        "currency": transaction.currency,
+        "account_from": transaction.account_from.name if transaction.account_from else None,
+        "account_to": transaction.account_to.name if transaction.account_to else None,
+        "currency_to": transaction.currency_to,
+        "amount_to": transaction.amount_to,
+        "exchange_rate": transaction.exchange_rate,
+        "description": transaction.description,
+        "date": transaction.date,
+        "created_at": transaction.created_at,
+    }, 201)
 
 
 @app.route("/transactions/<int:transaction_id>", methods=["PUT"])
@@ -749,8 +885,8 @@ async def update_transaction(transaction_id: int):
     Returns:
         - transaction: Updated transaction information
     """
-    current_user_id = int(get_jwt_identity())
-    data = request.get_json()
+    current_user_id = get_jwt_identity()
+    data = await _read_json()
 
     # Extract all possible fields
     amount = data.get("amount")
@@ -771,60 +907,53 @@ async def update_transaction(transaction_id: int):
     date = None
     if date_str:
         try:
-            # Handle date-only strings (YYYY-MM-DD) by treating them as noon UTC
-            # This prevents timezone conversion issues where the date might shift
-            if len(date_str) == 10 and 'T' not in date_str:
-                # Date-only format, use noon UTC to avoid date boundary issues
-                date = datetime.fromisoformat(date_str + 'T12:00:00+00:00')
-            else:
-                # Full datetime format
-                date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+            date = _parse_transaction_date(date_str)
         except ValueError:
-            return jsonify({"error": "Invalid date format. Use ISO format (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)"}), 400
-
-    async with async_session_maker() as session:
-        transaction, error = await TransactionService.update_transaction(
-            session=session,
-            user_id=current_user_id,
-            transaction_id=transaction_id,
-            amount=amount,
-            description=description,
-            date=date,
-            transaction_type=transaction_type,
-            currency=currency,
-            account_from=account_from,
-            account_to=account_to,
-            category_id=category_id,
-            merchant_id=merchant_id,
-            is_necessary=is_necessary,
-            currency_to=currency_to,
-            amount_to=amount_to,
-            exchange_rate=exchange_rate,
-        )
-
-        if error:
-            status_code = 404 if "not found" in error.lower() else 400
-            return jsonify({"error": error}), status_code
-
-        return jsonify({
-            "id": transaction.id,
-            "type": transaction.type.value if hasattr(transaction.type, 'value') else str(transaction.type),
-            "amount": float(transaction.amount),
-            "currency": transaction.currency,
-            "account_from": transaction.account_from.name if transaction.account_from else None,
-            "account_to": transaction.account_to.name if transaction.account_to else None,
-            "category_id": transaction.category_id,
-            "category": transaction.category.name if transaction.category else None,
-            "merchant_id": transaction.merchant_id,
-            "merchant": transaction.merchant.name if transaction.merchant else None,
-            "is_necessary": transaction.is_necessary,
-            "currency_to": transaction.currency_to,
-            "amount_to": float(transaction.amount_to) if transaction.amount_to else None,
-            "exchange_rate": float(transaction.exchange_rate) if transaction.exchange_rate else None,
-            "description": transaction.description,
-            "date": transaction.date.isoformat(),
-            "updated_at": transaction.created_at.isoformat(),
-        }), 200
+            return _static_response(_ERR_INVALID_DATE_FORMAT, 400)
+
+    session = g.db
+    transaction, error = await TransactionService.update_transaction(
+        session=session,
+        user_id=current_user_id,
+        transaction_id=transaction_id,
+        amount=amount,
+        description=description,
+        date=date,
+        transaction_type=transaction_type,
+        currency=currency,
+        account_from=account_from,
+        account_to=account_to,
+        category_id=category_id,
+        merchant_id=merchant_id,
+        is_necessary=is_necessary,
+        currency_to=currency_to,
+        amount_to=amount_to,
+        exchange_rate=exchange_rate,
+    )
+
+    if error:
+        status_code = 404 if "not found" in error.lower() else 400
+        return _json_response({"error": error}, status_code)
+
+    return _json_response({
+        "id": transaction.id,
+        "type": transaction.type,
+        "amount": transaction.amount,
+        "currency": transaction.currency,
+        "account_from": transaction.account_from.name if transaction.account_from else None,
+        "account_to": transaction.account_to.name if transaction.account_to else None,
+        "category_id": transaction.category_id,
+        "category": transaction.category.name if transaction.category else None,
+        "merchant_id": transaction.merchant_id,
+        "merchant": transaction.merchant.name if transaction.merchant else None,
+        "is_necessary": transaction.is_necessary,
+        "currency_to": transaction.currency_to,
+        "amount_to": transaction.amount_to,
+        "exchange_rate": transaction.exchange_rate,
+        "description": transaction.description,
+        "date": transaction.date,
+        "updated_at": transaction.created_at,
+    })
 
 
 @app.route("/transactions/<int:transaction_id>", methods=["DELETE"])
@@ -839,31 +968,31 @@ async def delete_transaction(transaction_id: int):
     Returns:
         - message: Success message
     """
-    current_user_id = int(get_jwt_identity())
+    current_user_id = get_jwt_identity()
 
-    async with async_session_maker() as session:
-        from sqlalchemy import select, delete
-        from libs.db.models import Transaction
-
-        # Verify transaction exists and belongs to user
-        result = await session.execute(
-            select(Transaction).where(
-                Transaction.id == transaction_id,
-                Transaction.user_id == current_user_id
-            )
+    session = g.db
+    from sqlalchemy import select, delete
+    from libs.db.models import Transaction
+
+    # Verify transaction exists and belongs to user
+    result = await session.execute(
+        select(Transaction).where(
+            Transaction.id == transaction_id,
+            Transaction.user_id == current_user_id
         )
-        transaction = result.scalar_one_or_none()
+    )
+    transaction = result.scalar_one_or_none()
 
-        if not transaction:
-            return jsonify({"error": "Transaction not found"}), 404
+    if not transaction:
+        return _static_response(_ERR_TRANSACTION_NOT_FOUND, 404)
 
-        # Delete the transaction
-        await session.execute(
-            delete(Transaction).where(Transaction.id == transaction_id)
-        )
-        await session.commit()
+    # Delete the transaction
+    await session.execute(
+        delete(Transaction).where(Transaction.id == transaction_id)
+    )
+    await session.commit()
 
-        return jsonify({"message": "Transaction deleted successfully"}), 200
+    return _json_response({"message": "Transaction deleted successfully"})
 
 
 # ==================== Analytics ====================
@@ -886,59 +1015,69 @@ async def get_analytics():
         - largest_expense: Largest expense transaction
         - largest_income: Largest income transaction
     """
-    current_user_id = int(get_jwt_identity())
+    current_user_id = get_jwt_identity()
 
     date_from_str = request.args.get("date_from")
     date_to_str = request.args.get("date_to")
     currency = request.args.get("currency")
 
     if not date_from_str or not date_to_str:
-        return jsonify({"error": "date_from and date_to are required"}), 400
+        return _static_response(_ERR_DATE_RANGE_REQUIRED, 400)
 
     try:
-        date_from = datetime.fromisoformat(date_from_str.replace('Z', '+00:00'))
-        date_to = datetime.fromisoformat(date_to_str.replace('Z', '+00:00'))
+        date_from = datetime.fromisoformat(date_from_str)
+        date_to = datetime.fromisoformat(date_to_str)
     except ValueError:
-        return jsonify({"error": "Invalid date format"}), 400
-
-    async with async_session_maker() as session:
-        # Get totals
-        total_income = await TransactionCRUD.get_total_by_type(
-            session, current_user_id, date_from, date_to, TransactionType.INCOME, currency
-        )
-        total_expenses = await TransactionCRUD.get_total_by_type(
-            session, current_user_id, date_from, date_to, TransactionType.EXPENSE, currency
-        )
-
-        # Get largest transactions
-        largest_expense = await TransactionCRUD.get_largest_in_period(
-            session, current_user_id, date_from, date_to, TransactionType.EXPENSE
-        )
-        largest_income = await TransactionCRUD.get_largest_in_period(
-            session, current_user_id, date_from, date_to, TransactionType.INCOME
-        )
-
-        return jsonify({
-            "period": {
-                "from": date_from.isoformat(),
-                "to": date_to.isoformat(),
-            },
-            "total_income": float(total_income),
-            "total_expenses": float(total_expenses),
-            "net_savings": float(total_income - total_expenses),
-            "largest_expense": {
-                "amount": float(largest_expense.amount),
-                "currency": largest_expense.currency,
-                "description": largest_expense.description,
-                "date": largest_expense.date.isoformat(),
-            } if largest_expense else None,
-            "largest_income": {
-                "amount": float(largest_income.amount),
-                "currency": largest_income.currency,
-                "description": largest_income.description,
-                "date": largest_income.date.isoformat(),
-            } if largest_income else None,
-        }), 200
+        return _static_response(_ERR_INVALID_DATE, 400)
+
+    # The four reads are independent; each runs on its own session because an
+    # AsyncSession can't run statements concurrently
+    (
+        total_income,
+        total_expenses,
+        largest_expense,
+        largest_income,
+    ) = await asyncio.gather(
+        _in_own_session(
+            TransactionCRUD.get_total_by_type,
+            current_user_id, date_from, date_to, TransactionType.INCOME, currency,
+        ),
+        _in_own_session(
+            TransactionCRUD.get_total_by_type,
+            current_user_id, date_from, date_to, TransactionType.EXPENSE, currency,
+        ),
+        _in_own_session(
+            TransactionCRUD.get_largest_in_period,
+            current_user_id, date_from, date_to, TransactionType.EXPENSE,
+        ),
+        _in_own_session(
+            TransactionCRUD.get_largest_in_period,
+            current_user_id, date_from, date_to, TransactionType.INCOME,
+        ),
+    )
+
+    # Decimals are written to the wire as-is by _json_response
+    return _json_response({
+        "period": {
+            "from": date_from,
+            "to": date_to,
+        },
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "net_savings": total_income - total_expenses,
+        "largest_expense": {
+            "amount": largest_expense.amount,
+            "currency": largest_expense.currency,
+            "description": largest_expense.description,
+            "date": largest_expense.date,
+        } if largest_expense else None,
+        "largest_income": {
+            "amount": largest_income.amount,
+            "currency": largest_income.currency,
+            "description": largest_income.description,
+            "date": largest_income.date,
+        } if largest_income else None,
+    })
 
 
 # ==================== Categories ====================
@@ -952,24 +1091,25 @@ async def list_categories():
     Returns:
         - categories: List of categories with id, name, type, and created_at
     """
-    current_user_id = int(get_jwt_identity())
+    current_user_id = get_jwt_identity()
 
-    async with async_session_maker() as session:
-        from libs.db.crud import CategoryCRUD
+    session = g.db
+    from libs.db.crud import CategoryCRUD
 
-        categories = await CategoryCRUD.get_all(session, current_user_id)
+    # Fetch plain rows instead of hydrating ORM objects
+    rows = await CategoryCRUD.get_all_rows(session, current_user_id)
 
-        return jsonify({
-            "categories": [
-                {
-                    "id": category.id,
-                    "name": category.name,
-                    "type": category.type,
-                    "created_at": category.created_at.isoformat(),
-                }
-                for category in categories
-            ]
-        }), 200
+    return _json_response({
+        "categories": [
+            {
+                "id": category_id,
+                "name": name,
+                "type": category_type,
+                "created_at": created_at,
+            }
+            for category_id, name, category_type, created_at in rows
+        ]
+    })
 
 
 @app.route("/categories", methods=["POST"])
@@ -988,34 +1128,106 @@ async def create_category():
         - type: Category type
         - created_at: Creation timestamp
     """
-    current_user_id = int(get_jwt_identity())
-    data = request.get_json()
+    current_user_id = get_jwt_identity()
+    data = await _read_json()
 
     name = data.get("name")
     category_type = data.get("type")
 
     if not name or not category_type:
-        return jsonify({"error": "name and type are required"}), 400
+        return _static_response(_ERR_NAME_TYPE_REQUIRED, 400)
 
-    if category_type not in ["income", "expense"]:
-        return jsonify({"error": "type must be 'income' or 'expense'"}), 400
+    if category_type not in _VALID_CATEGORY_TYPES:
+        return _static_response(_ERR_INVALID_CATEGORY_TYPE, 400)
 
-    async with async_session_maker() as session:
-        from libs.db.crud import CategoryCRUD
+    session = g.db
+    from libs.db.crud import CategoryCRUD
 
-        # Check if category with same name already exists
-        existing = await CategoryCRUD.get_by_name(session, current_user_id, name)
-        if existing:
-            return jsonify({"error": "Category with this name already exists"}), 400
+    # Check if category with same name already exists
+    existing = await CategoryCRUD.get_by_name(session, current_user_id, name)
+    if existing:
+        return _static_response(_ERR_CATEGORY_EXISTS, 400)
 
-        category = await CategoryCRUD.create(session, current_user_id, name, category_type)
+    category = await CategoryCRUD.create(session, current_user_id, name, category_type)
 
-        return jsonify({
-            "id": category.id,
-            "name": category.name,
-            "type": category.type,
-            "created_at": category.created_at.isoformat(),
-        }), 201
+    return _json_response({
+        "id": category.id,
+        "name": category.name,
+        "type": category.type,
+        "created_at": category.created_at,
+    }, 201)
+
+
+@app.route("/categories/bulk", methods=["POST"])
+@jwt_required()
+async def create_categories_bulk():
+    """
+    Create several categories for the authenticated user at once.
+
+    Names that already exist are left untouched and reported back, so the
+    endpoint is safe to call repeatedly from import flows.
+
+    Request body:
+        - categories: List of objects with name and type (income or expense)
+
+    Returns:
+        - created: Categories created by this request
+        - existing: Requested categories that already existed
+    """
+    current_user_id = get_jwt_identity()
+    data = await _read_json()
+
+    items = data.get("categories")
+    if not isinstance(items, list) or not items:
+        return _static_response(_ERR_CATEGORIES_REQUIRED, 400)
+
+    # Keep the first type given for each name
+    requested = {}
+    for item in items:
+        name = item.get("name") if isinstance(item, dict) else None
+        category_type = item.get("type") if isinstance(item, dict) else None
+
+        if not name or not category_type:
+            return _static_response(_ERR_NAME_TYPE_REQUIRED, 400)
+
+        if category_type not in _VALID_CATEGORY_TYPES:
+            return _static_response(_ERR_INVALID_CATEGORY_TYPE, 400)
+
+        requested.setdefault(name, category_type)
+
+    session = g.db
+    from libs.db.crud import CategoryCRUD
+
+    # One query for all names instead of a get_by_name per item
+    existing = await CategoryCRUD.get_many_by_names(
+        session, current_user_id, list(requested)
+    )
+    created = await CategoryCRUD.create_many(
+        session,
+        current_user_id,
+        [(name, t) for name, t in requested.items() if name not in existing],
+    )
+
+    return _json_response({
+        "created": [
+            {
+                "id": category.id,
+                "name": category.name,
+                "type": category.type,
+                "created_at": category.created_at,
+            }
+            for category in created
+        ],
+        "existing": [
+            {
+                "id": category.id,
+                "name": category.name,
+                "type": category.type,
+                "created_at": category.created_at,
+            }
+            for category in existing.values()
+        ],
+    }, 201)
 
 
 @app.route("/categories/<int:category_id>", methods=["PUT"])
@@ -1037,37 +1249,37 @@ async def update_category(category_id: int):
         - type: Category type
         - created_at: Creation timestamp
     """
-    current_user_id = int(get_jwt_identity())
-    data = request.get_json()
+    current_user_id = get_jwt_identity()
+    data = await _read_json()
 
     name = data.get("name")
     category_type = data.get("type")
 
-    if category_type and category_type not in ["income", "expense"]:
-        return jsonify({"error": "type must be 'income' or 'expense'"}), 400
+    if category_type and category_type not in _VALID_CATEGORY_TYPES:
+        return _static_response(_ERR_INVALID_CATEGORY_TYPE, 400)
 
-    async with async_session_maker() as session:
-        from libs.db.crud import CategoryCRUD
+    session = g.db
+    from libs.db.crud import CategoryCRUD
 
-        # Check if category with same name already exists (excluding current category)
-        if name:
-            existing = await CategoryCRUD.get_by_name(session, current_user_id, name)
-            if existing and existing.id != category_id:
-                return jsonify({"error": "Category with this name already exists"}), 400
+    # Check if category with same name already exists (excluding current category)
+    if name:
+        existing = await CategoryCRUD.get_by_name(session, current_user_id, name)
+        if existing and existing.id != category_id:
+            return _static_response(_ERR_CATEGORY_EXISTS, 400)
 
-        category = await CategoryCRUD.update(
-            session, category_id, current_user_id, name, category_type
-        )
+    category = await CategoryCRUD.update(
+        session, category_id, current_user_id, name, category_type
+    )
 
-        if not category:
-            return jsonify({"error": "Category not found"}), 404
+    if not category:
+        return _static_response(_ERR_CATEGORY_NOT_FOUND, 404)
 
-        return jsonify({
-            "id": category.id,
-            "name": category.name,
-            "type": category.type,
-            "created_at": category.created_at.isoformat(),
-        }), 200
+    return _json_response({
+        "id": category.id,
+        "name": category.name,
+        "type": category.type,
+        "created_at": category.created_at,
+    })
 
 
 @app.route("/categories/<int:category_id>", methods=["DELETE"])
@@ -1082,17 +1294,17 @@ async def delete_category(category_id: int):
     Returns:
         - message: Success message
     """
-    current_user_id = int(get_jwt_identity())
+    current_user_id = get_jwt_identity()
 
-    async with async_session_maker() as session:
-        from libs.db.crud import CategoryCRUD
+    session = g.db
+    from libs.db.crud import CategoryCRUD
 
-        deleted = await CategoryCRUD.delete(session, category_id, current_user_id)
+    deleted = await CategoryCRUD.delete(session, category_id, current_user_id)
 
-        if not deleted:
-            return jsonify({"error": "Category not found"}), 404
+    if not deleted:
+        return _static_response(_ERR_CATEGORY_NOT_FOUND, 404)
 
-        return jsonify({"message": "Category deleted successfully"}), 200
+    return _json_response({"message": "Category deleted successfully"})
 
 
 # ==================== Merchants ====================
@@ -1106,23 +1318,24 @@ async def list_merchants():
     Returns:
         - merchants: List of merchants with id, name, and created_at
     """
-    current_user_id = int(get_jwt_identity())
+    current_user_id = get_jwt_identity()
 
-    async with async_session_maker() as session:
-        from libs.db.crud import MerchantCRUD
+    session = g.db
+    from libs.db.crud import MerchantCRUD
 
-        merchants = await MerchantCRUD.get_all(session, current_user_id)
+    # Fetch plain rows instead of hydrating ORM objects
+    rows = await MerchantCRUD.get_all_rows(session, current_user_id)
 
-        return jsonify({
-            "merchants": [
-                {
-                    "id": merchant.id,
-                    "name": merchant.name,
-                    "created_at": merchant.created_at.isoformat(),
-                }
-                for merchant in merchants
-            ]
-        }), 200
+    return _json_response({
+        "merchants": [
+            {
+                "id": merchant_id,
+                "name": name,
+                "created_at": created_at,
+            }
+            for merchant_id, name, created_at in rows
+        ]
+    })
 
 
 @app.route("/merchants", methods=["POST"])
@@ -1139,29 +1352,29 @@ async def create_merchant():
         - name: Merchant name
         - created_at: Creation timestamp
     """
-    current_user_id = int(get_jwt_identity())
-    data = request.get_json()
+    current_user_id = get_jwt_identity()
+    data = await _read_json()
 
     name = data.get("name")
 
     if not name:
-        return jsonify({"error": "name is required"}), 400
+        return _static_response(_ERR_NAME_REQUIRED, 400)
 
-    async with async_session_maker() as session:
-        from libs.db.crud import MerchantCRUD
+    session = g.db
+    from libs.db.crud import MerchantCRUD
 
-        # Check if merchant with same name already exists
-        existing = await MerchantCRUD.get_by_name(session, current_user_id, name)
-        if existing:
-            return jsonify({"error": "Merchant with this name already exists"}), 400
+    # Check if merchant with same name already exists
+    existing = await MerchantCRUD.get_by_name(session, current_user_id, name)
+    if existing:
+        return _static_response(_ERR_MERCHANT_EXISTS, 400)
 
-        merchant = await MerchantCRUD.create(session, current_user_id, name)
+    merchant = await MerchantCRUD.create(session, current_user_id, name)
 
-        return jsonify({
-            "id": merchant.id,
-            "name": merchant.name,
-            "created_at": merchant.created_at.isoformat(),
-        }), 201
+    return _json_response({
+        "id": merchant.id,
+        "name": merchant.name,
+        "created_at": merchant.created_at,
+    }, 201)
 
 
 @app.route("/merchants/<int:merchant_id>", methods=["PUT"])
@@ -1181,34 +1394,34 @@ async def update_merchant(merchant_id: int):
         - name: Merchant name
         - created_at: Creation timestamp
     """
-    current_user_id = int(get_jwt_identity())
-    data = request.get_json()
+    current_user_id = get_jwt_identity()
+    data = await _read_json()
 
     name = data.get("name")
 
     if not name:
-        return jsonify({"error": "name is required"}), 400
+        return _static_response(_ERR_NAME_REQUIRED, 400)
 
-    async with async_session_maker() as session:
-        from libs.db.crud import MerchantCRUD
+    session = g.db
+    from libs.db.crud import MerchantCRUD
 
-        # Check if merchant with same name already exists (excluding current merchant)
-        existing = await MerchantCRUD.get_by_name(session, current_user_id, name)
-        if existing and existing.id != merchant_id:
-            return jsonify({"error": "Merchant with this name already exists"}), 400
+    # Check if merchant with same name already exists (excluding current merchant)
+    existing = await MerchantCRUD.get_by_name(session, current_user_id, name)
+    if existing and existing.id != merchant_id:
+        return _static_response(_ERR_MERCHANT_EXISTS, 400)
 
-        merchant = await MerchantCRUD.update(
-            session, merchant_id, current_user_id, name
-        )
+    merchant = await MerchantCRUD.update(
+        session, merchant_id, current_user_id, name
+    )
 
-        if not merchant:
-            return jsonify({"error": "Merchant not found"}), 404
+    if not merchant:
+        return _static_response(_ERR_MERCHANT_NOT_FOUND, 404)
 
-        return jsonify({
-            "id": merchant.id,
-            "name": merchant.name,
-            "created_at": merchant.created_at.isoformat(),
-        }), 200
+    return _json_response({
+        "id": merchant.id,
+        "name": merchant.name,
+        "created_at": merchant.created_at,
+    })
 
 
 @app.route("/merchants/<int:merchant_id>", methods=["DELETE"])
@@ -1223,17 +1436,17 @@ async def delete_merchant(merchant_id: int):
     Returns:
         - message: Success message
     """
-    current_user_id = int(get_jwt_identity())
+    current_user_id = get_jwt_identity()
 
-    async with async_session_maker() as session:
-        from libs.db.crud import MerchantCRUD
+    session = g.db
+    from libs.db.crud import MerchantCRUD
 
-        deleted = await MerchantCRUD.delete(session, merchant_id, current_user_id)
+    deleted = await MerchantCRUD.delete(session, merchant_id, current_user_id)
 
-        if not deleted:
-            return jsonify({"error": "Merchant not found"}), 404
+    if not deleted:
+        return _static_response(_ERR_MERCHANT_NOT_FOUND, 404)
 
-        return jsonify({"message": "Merchant deleted successfully"}), 200
+    return _json_response({"message": "Merchant deleted successfully"})
 
 
 @app.route("/link-telegram", methods=["POST"])
@@ -1248,40 +1461,43 @@ async def link_telegram():
     Returns:
         - message: Success message
     """
-    current_user_id = int(get_jwt_identity())
-    data = request.get_json()
+    current_user_id = get_jwt_identity()
+    data = await _read_json()
     telegram_user_id = data.get("telegram_user_id")
 
     if not telegram_user_id:
-        return jsonify({"error": "telegram_user_id is required"}), 400
-
-    async with async_session_maker() as session:
-        from sqlalchemy import select, update
-        from libs.db.models import User
-
-        # Check if telegram_user_id is already linked to another account
-        result = await session.execute(
-            select(User).where(User.telegram_user_id == telegram_user_id)
+        return _static_response(_ERR_TELEGRAM_ID_REQUIRED, 400)
+
+    session = g.db
+    from sqlalchemy import and_, exists, update
+    from sqlalchemy.orm import aliased
+    from libs.db.models import User
+
+    # Link telegram account to current user, unless it is already linked
+    # to another account. Both checks run in a single round-trip.
+    other_user = aliased(User)
+    result = await session.execute(
+        update(User)
+        .where(
+            User.id == current_user_id,
+            ~exists().where(
+                and_(
+                    other_user.telegram_user_id == telegram_user_id,
+                    other_user.id != current_user_id,
+                )
+            ),
         )
-        existing_user = result.scalar_one_or_none()
-
-        if existing_user and existing_user.id != current_user_id:
-            return jsonify({
-                "error": "This Telegram account is already linked to another user"
-            }), 400
+        .values(telegram_user_id=telegram_user_id)
+        .returning(User.id)
+    )
 
-        # Link telegram account to current user
-        await session.execute(
-            update(User)
-            .where(User.id == current_user_id)
-            .values(telegram_user_id=telegram_user_id)
-        )
-        await session.commit()
+    if result.scalar_one_or_none() is None:
+        await session.rollback()
+        return _static_response(_ERR_TELEGRAM_ALREADY_LINKED, 400)
 
-        return jsonify({
-            "message": "Telegram account linked successfully"
-        }), 200
+    await session.commit()
 
+    return _json_response({
+        "message": "Telegram account linked successfully"
+    })
 
-if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=5000)
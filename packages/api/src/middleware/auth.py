@@ -0,0 +1,132 @@
+"""JWT authentication helpers for the Quart API.
+
+Tokens keep the claim layout Flask-JWT-Extended used (sub, type, fresh, jti,
+csrf, iat, nbf, exp), so tokens issued before the move to Quart stay valid.
+Error responses keep its ``{"msg": ...}`` shape and status codes.
+
+The user id is also stored as an integer ``uid`` claim. ``sub`` has to stay a
+string (RFC 7519, enforced by PyJWT), and ``uid`` lets handlers use the id
+without parsing it.
+
+Successful verifications are cached for a few seconds, keyed by the token's
+SHA-256, so clients making bursts of calls skip the signature check. A cached
+entry never outlives the token's ``exp``, and failures are never cached.
+"""
+
+import hashlib
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import wraps
+
+import jwt
+import orjson
+from cachetools import TTLCache
+from quart import Response, current_app, g, request
+
+ALGORITHM = "HS256"
+
+# "Bearer " followed by three base64url segments
+_BEARER_RE = re.compile(r"Bearer ([A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+)")
+MAX_HEADER_LENGTH = 4096
+
+VERIFIED_TOKEN_TTL_SECONDS = 10
+_verified_tokens: TTLCache = TTLCache(maxsize=10_000, ttl=VERIFIED_TOKEN_TTL_SECONDS)
+
+
+def _auth_error(message: str, status: int) -> Response:
+    return Response(
+        orjson.dumps({"msg": message}), status=status, mimetype="application/json"
+    )
+
+
+def create_access_token(identity: int, additional_claims=None) -> str:
+    """
+    Create a signed access token for the given user.
+
+    Args:
+        identity: User ID, stored as ``uid`` and as the string ``sub`` claim
+        additional_claims: Extra claims to embed in the token
+
+    Returns:
+        Encoded JWT
+    """
+    now = datetime.now(timezone.utc)
+    claims = {
+        "fresh": False,
+        "iat": now,
+        "jti": str(uuid.uuid4()),
+        "type": "access",
+        "sub": str(identity),
+        "uid": identity,
+        "nbf": now,
+        "csrf": str(uuid.uuid4()),
+        "exp": now + current_app.config["JWT_ACCESS_TOKEN_EXPIRES"],
+    }
+    if additional_claims:
+        claims.update(additional_claims)
+
+    return jwt.encode(claims, current_app.config["JWT_SECRET_KEY"], algorithm=ALGORITHM)
+
+
+def jwt_required():
+    """Require a valid access token in the Authorization header."""
+
+    def wrapper(view):
+        @wraps(view)
+        async def decorator(*args, **kwargs):
+            header = request.headers.get("Authorization")
+            if not header:
+                return _auth_error("Missing Authorization Header", 401)
+
+            # Reject anything that isn't shaped like a JWT before hashing or
+            # decoding it
+            match = None
+            if len(header) <= MAX_HEADER_LENGTH:
+                match = _BEARER_RE.fullmatch(header)
+            if match is None:
+                return _auth_error(
+                    "Bad Authorization header. Expected 'Authorization: Bearer <JWT>'",
+                    401,
+                )
+            token = match.group(1)
+
+            cache_key = hashlib.sha256(token.encode()).digest()
+            cached = _verified_tokens.get(cache_key)
+            if cached is not None and cached.get("exp", 0) > time.time():
+                claims = cached
+            else:
+                try:
+                    claims = jwt.decode(
+                        token,
+                        current_app.config["JWT_SECRET_KEY"],
+                        algorithms=[ALGORITHM],
+                    )
+                except jwt.ExpiredSignatureError:
+                    return _auth_error("Token has expired", 401)
+                except jwt.InvalidTokenError as e:
+                    return _auth_error(str(e), 422)
+
+                if claims.get("type") != "access":
+                    return _auth_error("Only non-refresh tokens are allowed", 422)
+
+                _verified_tokens[cache_key] = claims
+
+            g.jwt_claims = claims
+            uid = claims.get("uid")
+            # Tokens issued before the uid claim existed only carry the string sub
+            g.uid = uid if uid is not None else int(claims["sub"])
+            return await view(*args, **kwargs)
+
+        return decorator
+
+    return wrapper
+
+
+def get_jwt_identity() -> int:
+    """Return the user ID of the token verified for this request.
+
+    Resolved once by ``jwt_required`` and kept on ``g.uid``.
+    """
+    return g.uid
@@ -0,0 +1,65 @@
+"""Typed response models for the Quart API.
+
+msgspec encodes Structs straight to JSON without building a dict per row.
+Decimals are written as exact JSON numbers, matching the orjson responses.
+Timestamps are carried as isoformat strings: msgspec writes UTC datetimes with
+a ``Z`` suffix, while orjson and the rest of the API write ``+00:00``.
+"""
+
+from decimal import Decimal
+from typing import List, Optional
+
+import msgspec
+
+
+class BalanceOut(msgspec.Struct):
+    currency: str
+    balance: Decimal
+    updated_at: str
+
+
+class AccountOut(msgspec.Struct, omit_defaults=True):
+    id: int
+    name: str
+    type: str
+    track_balance: Optional[bool]
+    created_at: str
+    # Left out of the JSON when balances weren't requested
+    balances: Optional[List[BalanceOut]] = None
+
+
+class AccountListOut(msgspec.Struct):
+    accounts: List[AccountOut]
+    count: int
+
+
+def account_list_out(accounts, include_balances: bool) -> AccountListOut:
+    """Build the /accounts response from Account rows.
+
+    ``account.balances`` is only read when ``include_balances`` is set, as it is
+    only eager-loaded then.
+    """
+    return AccountListOut(
+        accounts=[
+            AccountOut(
+                id=account.id,
+                name=account.name,
+                type=account.type,
+                track_balance=account.track_balance,
+                created_at=account.created_at.isoformat(),
+                balances=[
+                    BalanceOut(
+                        currency=balance.currency,
+                        balance=balance.balance,
+                        updated_at=balance.updated_at.isoformat(),
+                    )
+                    for balance in account.balances
+                ] if include_balances else None,
+            )
+            for account in accounts
+        ],
+        count=len(accounts),
+    )
+
+
+encoder = msgspec.json.Encoder(decimal_format="number")
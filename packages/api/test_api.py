@@ -1,242 +1,244 @@
 """
-Simple test script for the Expense Tracker API.
+Simple test suite for the Expense Tracker API.
 
-This script tests the main API endpoints to ensure they work correctly.
-Run this after starting the API server.
+This suite tests the main API endpoints to ensure they work correctly.
+Run this after starting the API server, with `pytest test_api.py` (add
+`-n auto` when pytest-xdist is installed) or `python test_api.py`.
 """
 
-import requests
-import json
+import asyncio
+import httpx
+import logging
+import orjson
+import os
+import pytest
+import pytest_asyncio
+import sys
 from datetime import datetime, timedelta
 
 # API base URL
 BASE_URL = "http://localhost:5000"
 
+# One client per test session. HTTP/2 is negotiated over TLS (https
+# BASE_URL); against plain http://localhost it falls back to keep-alive HTTP/1.1.
+CLIENT_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+# Connection attempts are retried with exponential backoff, so a suite started
+# right after the server doesn't die on the first request racing its bind
+CONNECT_RETRIES = 5
+
+# Request bodies are encoded with orjson and sent as raw content. httpx never
+# adds `Expect: 100-continue`, so each POST body goes out with its headers
+# without waiting a round-trip for a 100 response.
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Print full response bodies
+VERBOSE = os.environ.get("TEST_VERBOSE") == "1"
+RULE = "=" * 60
+
+# Output is captured by pytest; shown for failures, or live with -o log_cli=true
+logger = logging.getLogger("test_api")
+logger.setLevel(logging.INFO)
+
 # Test data
 TEST_EMAIL = f"test_{datetime.now().timestamp()}@example.com"
 TEST_PASSWORD = "TestPassword123"
 
+# Request bodies, serialized once
+SIGNUP_BODY = orjson.dumps({
+    "email": TEST_EMAIL,
+    "password": TEST_PASSWORD,
+    "language_code": "en"
+})
+ACCOUNT_BODY = orjson.dumps({
+    "name": "Test Checking",
+    "type": "bank",
+    "track_balance": True
+})
+INCOME_BODY = orjson.dumps({
+    "transaction_type": "income",
+    "amount": 2000.00,
+    "currency": "USD",
+    "account_to": "Test Checking",
+    "description": "Test Salary"
+})
+EXPENSE_BODY = orjson.dumps({
+    "transaction_type": "expense",
+    "amount": 50.00,
+    "currency": "USD",
+    "account_from": "Test Checking",
+    "description": "Test Grocery Shopping"
+})
+
+# Date range for the list/analytics tests: last 30 days, the same window for both
+_END = datetime.now()
+_START = _END - timedelta(days=30)
+DATE_FROM = _START.isoformat()
+DATE_TO = _END.isoformat()
+TRANSACTIONS_PARAMS = {"date_from": DATE_FROM, "date_to": DATE_TO, "limit": 10}
+ANALYTICS_PARAMS = {"date_from": DATE_FROM, "date_to": DATE_TO, "currency": "USD"}
+
 def print_response(name, response):
-    """Print formatted response."""
-    print(f"\n{'='*60}")
-    print(f"{name}")
-    print(f"{'='*60}")
-    print(f"Status: {response.status_code}")
-    try:
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-    except:
-        print(f"Response: {response.text}")
-    print(f"{'='*60}\n")
+    """Log a response summary; the full body only with TEST_VERBOSE=1.
 
-def test_health_check():
+    Logged as one record so concurrent tests don't interleave.
+    """
+    if not VERBOSE:
+        logger.info(f"{name}: {response.status_code} ({len(response.content)} bytes)")
+        return
+
+    try:
+        body = orjson.dumps(
+            orjson.loads(response.content), option=orjson.OPT_INDENT_2
+        ).decode()
+    except orjson.JSONDecodeError:
+        body = response.text
+    logger.info(
+        f"\n{RULE}\n{name}\n{RULE}\n"
+        f"Status: {response.status_code}\n"
+        f"Response: {body}\n"
+        f"{RULE}\n"
+    )
+
+# Session fixtures: signup, account and transactions are created once and
+# shared, then the read-only GETs run concurrently on the shared client; tests
+# whose setup request failed are skipped. Fixtures and tests all
+# run on the session loop, so the pooled client never crosses event loops.
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+def expect_created(response, what):
+    """Skip the requesting test unless a setup request returned 201."""
+    if response.status_code != 201:
+        pytest.skip(f"{what} failed with {response.status_code}")
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client():
+    """Shared API client, warmed up before the first test.
+
+    The pre-flight /health call pays for name resolution and the TCP (and
+    TLS) handshake up front and its response is discarded, so test_health_check
+    sees a pooled keep-alive connection. Aborts the run if the server is
+    unreachable.
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=True, limits=CLIENT_LIMITS, retries=CONNECT_RETRIES
+    )
+    async with httpx.AsyncClient(base_url=BASE_URL, transport=transport) as client:
+        try:
+            await client.get("/health", timeout=5)
+        except httpx.ConnectError:
+            pytest.exit(
+                f"Could not connect to API server after {CONNECT_RETRIES} retries. "
+                f"Make sure the API server is running at {BASE_URL}",
+                returncode=1,
+            )
+        yield client
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def signup(client):
+    """Sign up the test user."""
+    response = await client.post("/signup", content=SIGNUP_BODY, headers=JSON_HEADERS)
+    print_response("Sign Up", response)
+    return response
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def token(client, signup):
+    """Access token from signup; every call from here on is authenticated."""
+    expect_created(signup, "Signup")
+    token = orjson.loads(signup.content)["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    return token
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def account(client, token):
+    """Create the test account."""
+    response = await client.post("/accounts", content=ACCOUNT_BODY, headers=JSON_HEADERS)
+    print_response("Create Account", response)
+    return response
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def transactions(client, account):
+    """Create the income and expense transactions on the test account."""
+    expect_created(account, "Create account")
+    income = await client.post("/transactions", content=INCOME_BODY, headers=JSON_HEADERS)
+    print_response("Create Income Transaction", income)
+    expense = await client.post("/transactions", content=EXPENSE_BODY, headers=JSON_HEADERS)
+    print_response("Create Expense Transaction", expense)
+    return income, expense
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def reads(client, transactions):
+    """Run the read-only requests concurrently, once the writes are in."""
+    for response, what in zip(transactions, ("Create income", "Create expense")):
+        expect_created(response, what)
+    responses = await asyncio.gather(
+        client.get("/accounts?include_balances=true"),
+        client.get("/transactions", params=TRANSACTIONS_PARAMS),
+        client.get("/accounts/balances"),
+        client.get("/analytics", params=ANALYTICS_PARAMS),
+    )
+    names = ("List Accounts", "List Transactions", "Get Balances", "Analytics")
+    for name, response in zip(names, responses):
+        print_response(name, response)
+    return dict(zip(names, responses))
+
+async def test_health_check(client):
     """Test health check endpoint."""
-    response = requests.get(f"{BASE_URL}/health")
+    response = await client.get("/health")
     print_response("Health Check", response)
-    return response.status_code == 200
+    assert response.status_code == 200
 
-def test_signup():
+async def test_signup(signup):
     """Test user signup."""
-    data = {
-        "email": TEST_EMAIL,
-        "password": TEST_PASSWORD,
-        "language_code": "en"
-    }
-    response = requests.post(f"{BASE_URL}/signup", json=data)
-    print_response("Sign Up", response)
-
-    if response.status_code == 201:
-        return response.json().get("access_token")
-    return None
+    assert signup.status_code == 201
+    assert orjson.loads(signup.content).get("access_token")
 
-def test_signin(email, password):
+async def test_signin(client, token):
     """Test user signin."""
     data = {
-        "email": email,
-        "password": password
+        "email": TEST_EMAIL,
+        "password": TEST_PASSWORD
     }
-    response = requests.post(f"{BASE_URL}/signin", json=data)
+    # Sign in without the token set up after signup
+    auth_header = client.headers.pop("Authorization", None)
+    try:
+        response = await client.post("/signin", content=orjson.dumps(data), headers=JSON_HEADERS)
+    finally:
+        if auth_header is not None:
+            client.headers["Authorization"] = auth_header
     print_response("Sign In", response)
+    assert response.status_code == 200
+    assert orjson.loads(response.content).get("access_token")
 
-    if response.status_code == 200:
-        return response.json().get("access_token")
-    return None
-
-def test_create_account(token):
+async def test_create_account(account):
     """Test account creation."""
-    headers = {"Authorization": f"Bearer {token}"}
-    data = {
-        "name": "Test Checking",
-        "type": "bank",
-        "track_balance": True
-    }
-    response = requests.post(f"{BASE_URL}/accounts", json=data, headers=headers)
-    print_response("Create Account", response)
-    return response.status_code == 201
+    assert account.status_code == 201
 
-def test_list_accounts(token):
+async def test_list_accounts(reads):
     """Test listing accounts."""
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(f"{BASE_URL}/accounts?include_balances=true", headers=headers)
-    print_response("List Accounts", response)
-    return response.status_code == 200
+    assert reads["List Accounts"].status_code == 200
 
-def test_create_income(token):
+async def test_create_income(transactions):
     """Test creating income transaction."""
-    headers = {"Authorization": f"Bearer {token}"}
-    data = {
-        "transaction_type": "income",
-        "amount": 2000.00,
-        "currency": "USD",
-        "account_to": "Test Checking",
-        "description": "Test Salary"
-    }
-    response = requests.post(f"{BASE_URL}/transactions", json=data, headers=headers)
-    print_response("Create Income Transaction", response)
-    return response.status_code == 201
+    income, _ = transactions
+    assert income.status_code == 201
 
-def test_create_expense(token):
+async def test_create_expense(transactions):
     """Test creating expense transaction."""
-    headers = {"Authorization": f"Bearer {token}"}
-    data = {
-        "transaction_type": "expense",
-        "amount": 50.00,
-        "currency": "USD",
-        "account_from": "Test Checking",
-        "description": "Test Grocery Shopping"
-    }
-    response = requests.post(f"{BASE_URL}/transactions", json=data, headers=headers)
-    print_response("Create Expense Transaction", response)
-    return response.status_code == 201
+    _, expense = transactions
+    assert expense.status_code == 201
 
-def test_list_transactions(token):
+async def test_list_transactions(reads):
     """Test listing transactions."""
-    headers = {"Authorization": f"Bearer {token}"}
-
-    # Date range: last 30 days
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=30)
+    assert reads["List Transactions"].status_code == 200
 
-    params = {
-        "date_from": start_date.isoformat(),
-        "date_to": end_date.isoformat(),
-        "limit": 10
-    }
-
-    response = requests.get(f"{BASE_URL}/transactions", params=params, headers=headers)
-    print_response("List Transactions", response)
-    return response.status_code == 200
-
-def test_get_balances(token):
+async def test_get_balances(reads):
     """Test getting account balances."""
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(f"{BASE_URL}/accounts/balances", headers=headers)
-    print_response("Get Balances", response)
-    return response.status_code == 200
+    assert reads["Get Balances"].status_code == 200
 
-def test_analytics(token):
+async def test_analytics(reads):
     """Test analytics endpoint."""
-    headers = {"Authorization": f"Bearer {token}"}
-
-    # Date range: last 30 days
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=30)
-
-    params = {
-        "date_from": start_date.isoformat(),
-        "date_to": end_date.isoformat(),
-        "currency": "USD"
-    }
-
-    response = requests.get(f"{BASE_URL}/analytics", params=params, headers=headers)
-    print_response("Analytics", response)
-    return response.status_code == 200
-
-def run_tests():
-    """Run all tests."""
-    print("\n" + "="*60)
-    print("EXPENSE TRACKER API TESTS")
-    print("="*60)
-
-    results = {}
-
-    # Test health check
-    print("\n[1/9] Testing health check...")
-    results["health_check"] = test_health_check()
-
-    # Test signup
-    print("\n[2/9] Testing signup...")
-    token = test_signup()
-    results["signup"] = token is not None
-
-    if not token:
-        print("\n❌ Signup failed. Cannot continue with other tests.")
-        return results
-
-    # Test signin
-    print("\n[3/9] Testing signin...")
-    signin_token = test_signin(TEST_EMAIL, TEST_PASSWORD)
-    results["signin"] = signin_token is not None
-
-    # Test create account
-    print("\n[4/9] Testing create account...")
-    results["create_account"] = test_create_account(token)
-
-    # Test list accounts
-    print("\n[5/9] Testing list accounts...")
-    results["list_accounts"] = test_list_accounts(token)
-
-    # Test create income
-    print("\n[6/9] Testing create income transaction...")
-    results["create_income"] = test_create_income(token)
-
-    # Test create expense
-    print("\n[7/9] Testing create expense transaction...")
-    results["create_expense"] = test_create_expense(token)
-
-    # Test list transactions
-    print("\n[8/9] Testing list transactions...")
-    results["list_transactions"] = test_list_transactions(token)
-
-    # Test get balances
-    print("\n[9/9] Testing get balances...")
-    results["get_balances"] = test_get_balances(token)
-
-    # Test analytics
-    print("\n[10/10] Testing analytics...")
-    results["analytics"] = test_analytics(token)
-
-    # Print summary
-    print("\n" + "="*60)
-    print("TEST SUMMARY")
-    print("="*60)
-
-    passed = sum(1 for v in results.values() if v)
-    total = len(results)
-
-    for test_name, passed_flag in results.items():
-        status = "✅ PASSED" if passed_flag else "❌ FAILED"
-        print(f"{test_name.replace('_', ' ').title()}: {status}")
-
-    print(f"\nTotal: {passed}/{total} tests passed")
-    print("="*60 + "\n")
-
-    return results
+    assert reads["Analytics"].status_code == 200
 
 if __name__ == "__main__":
-    try:
-        results = run_tests()
-
-        # Exit with error code if any tests failed
-        if not all(results.values()):
-            exit(1)
-        else:
-            print("\n✅ All tests passed!\n")
-            exit(0)
-
-    except requests.exceptions.ConnectionError:
-        print("\n❌ Error: Could not connect to API server.")
-        print("Make sure the API server is running at http://localhost:5000\n")
-        exit(1)
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {e}\n")
-        exit(1)
+    sys.exit(pytest.main([__file__, *sys.argv[1:]]))
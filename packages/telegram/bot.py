@@ -1,8 +1,9 @@
 import logging
 from datetime import datetime
-import json
 
+import orjson
 from aiogram import Bot, Dispatcher, F, Router
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.storage.memory import MemoryStorage
@@ -11,6 +12,7 @@ from aiogram.utils.markdown import hbold
 
 from packages.agent.agent import FinanceAgent
 from packages.agent.tools.db_tool import QueryBalancesInput, QueryMonthlyReportInput
+from packages.telegram.bot_integration import register_financial_agent_handlers
 from packages.telegram.states import TransactionStates, SettingsStates
 from packages.telegram.keyboards import (
     build_main_settings_keyboard,
@@ -28,9 +30,17 @@ from sqlalchemy import select, update
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize bot and dispatcher with state storage
+def _orjson_dumps(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+
+# Initialize bot and dispatcher with state storage. Bot API responses
+# (including every getUpdates batch) are decoded with orjson.
 storage = MemoryStorage()
-bot = Bot(token=settings.telegram_bot_token)
+bot = Bot(
+    token=settings.telegram_bot_token,
+    session=AiohttpSession(json_loads=orjson.loads, json_dumps=_orjson_dumps),
+)
 dp = Dispatcher(storage=storage)
 router = Router()
 
@@ -738,14 +748,7 @@ async def noop_callback(callback: CallbackQuery) -> None:
 
 
 # Register Financial Analysis Agent router FIRST (higher priority)
-try:
-    from packages.telegram.financial_agent_handlers import financial_router
-    dp.include_router(financial_router)
-    logger.info("✅ Financial Analysis Agent handlers registered")
-except ImportError as e:
-    logger.error(f"❌ Failed to import financial agent handlers: {e}")
-except Exception as e:
-    logger.error(f"❌ Failed to register financial agent handlers: {e}")
+register_financial_agent_handlers(dp)
 
 # Register main router AFTER (lower priority, includes catch-all handlers)
 dp.include_router(router)
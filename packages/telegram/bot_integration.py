@@ -1,14 +1,19 @@
 """
 Bot integration module for Financial Analysis Agent.
 
-This module automatically registers the financial agent handlers with the main bot
-when imported. It provides seamless integration with the existing bot infrastructure.
+This module registers the financial agent handlers with the main bot. The
+handlers module (and the agent graph behind it) is only imported when the
+handlers are registered or ``financial_router`` is first accessed, so importing
+this module stays cheap.
 """
 
+from __future__ import annotations
+
 import logging
-from aiogram import Dispatcher
+from typing import TYPE_CHECKING
 
-from packages.telegram.financial_agent_handlers import financial_router
+if TYPE_CHECKING:
+    from aiogram import Dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +22,19 @@ def register_financial_agent_handlers(dp: Dispatcher) -> None:
     """
     Register financial agent handlers with the main dispatcher.
 
+    Safe to call more than once: if the router is already attached to ``dp``
+    (by an earlier call or by bot.py itself) this is a no-op. aiogram resolves
+    handlers by walking the router tree at dispatch time, so including the
+    router only links it to ``dp``; there is no dispatch table to precompute.
+
     Args:
         dp: Main Telegram bot dispatcher
     """
+    from packages.telegram.financial_agent_handlers import financial_router
+
+    if financial_router.parent_router is dp:
+        return
+
     try:
         # Include the financial router
         dp.include_router(financial_router)
@@ -30,18 +45,13 @@ def register_financial_agent_handlers(dp: Dispatcher) -> None:
         raise
 
 
-# Auto-registration when module is imported
-# This ensures the handlers are registered when the bot starts
-try:
-    # Import the main dispatcher from the bot module
-    from packages.telegram.bot import dp
-    register_financial_agent_handlers(dp)
+def __getattr__(name: str):
+    # Lazily expose financial_router for callers that register it manually
+    if name == "financial_router":
+        from packages.telegram.financial_agent_handlers import financial_router
 
-except ImportError:
-    # If main bot module isn't available yet, handlers will be registered manually
-    logger.warning("Main bot dispatcher not available during import. Handlers will need to be registered manually.")
-except Exception as e:
-    logger.error(f"Error during auto-registration: {e}")
+        return financial_router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Export the router for manual registration if needed
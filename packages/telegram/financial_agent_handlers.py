@@ -5,13 +5,18 @@ This module provides the Telegram bot interface for the Financial Analysis Agent
 including commands, callback handlers, interactive confirmation flows, and audio expense entry.
 """
 
+import asyncio
+import html
 import logging
-import os
-import tempfile
+import re
+import secrets
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from string import Template
 from typing import Dict, Any, Optional
 
+import orjson
 from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
@@ -20,16 +25,18 @@ from aiogram.types import (
     CallbackQuery,
     InlineKeyboardMarkup,
     InlineKeyboardButton,
-    Voice,
 )
-from aiogram.utils.markdown import hbold, hcode
+from aiogram.exceptions import TelegramAPIError
+from cachetools import TTLCache
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
 from packages.agent.financial_agent import FinancialAnalysisAgent
+from libs.config import settings
 from libs.db.base import async_session_maker
 from libs.db.crud import UserCRUD, TransactionCRUD, AccountCRUD
 from libs.db.models import TransactionType, AccountType
 from libs.utils.language import detect_language, Messages
-from packages.telegram.states import TransactionStates
 
 logger = logging.getLogger(__name__)
 
@@ -37,29 +44,224 @@ logger = logging.getLogger(__name__)
 financial_router = Router()
 financial_agent = FinancialAnalysisAgent()
 
-# Store pending confirmations (in production, use Redis or database)
-pending_confirmations: Dict[str, Dict[str, Any]] = {}
+# Pending confirmations expire after 10 minutes
+CONFIRMATION_TTL_SECONDS = 600
 
 
-def cleanup_expired_confirmations():
-    """Clean up confirmations older than 10 minutes to prevent memory leaks."""
-    from datetime import timedelta
+def _pack(pending: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the confirmation fields the callback handlers read back."""
+    confirmation = pending["confirmation"]
+    expense = confirmation["expense"]
+    classification = confirmation["classification"]
+    return {
+        "u": pending["user_id"],
+        "l": confirmation["resolved_language"],
+        "e": (
+            str(expense["amount"]),
+            expense["currency"],
+            expense["merchant"],
+            expense["note"],
+            expense["date"],
+        ),
+        "c": classification["category"],
+        "n": classification["is_necessary"],
+        "f": classification["confidence"],
+        "a": [alt["category"] for alt in classification["alternatives"]],
+    }
+
+
+def _unpack(packed: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild the ``{"confirmation", "user_id"}`` shape from a packed entry."""
+    amount, currency, merchant, note, date = packed["e"]
+    return {
+        "user_id": packed["u"],
+        "confirmation": {
+            "resolved_language": packed["l"],
+            "expense": {
+                "amount": Decimal(amount),
+                "currency": currency,
+                "merchant": merchant,
+                "note": note,
+                "date": date,
+            },
+            "classification": {
+                "category": packed["c"],
+                "is_necessary": packed["n"],
+                "confidence": packed["f"],
+                "alternatives": [{"category": category} for category in packed["a"]],
+            },
+        },
+    }
+
+
+class ConfirmationStore:
+    """
+    Pending expense confirmations kept in Redis.
+
+    Entries are stored as packed, orjson-encoded payloads with a TTL, so Redis
+    expires abandoned confirmations and any bot process can answer the
+    callback. Callers pass and get back ``{"confirmation": ..., "user_id": ...}``.
+    """
+
+    def __init__(self, redis: Redis, ttl: int = CONFIRMATION_TTL_SECONDS):
+        self._redis = redis
+        self._ttl = ttl
+
+    @staticmethod
+    def _key(confirmation_id: str) -> str:
+        return f"expense_confirmation:{confirmation_id}"
+
+    async def set(self, confirmation_id: str, payload: Dict[str, Any]) -> None:
+        """Store a new confirmation with a fresh TTL."""
+        await self._redis.set(
+            self._key(confirmation_id), orjson.dumps(_pack(payload)), ex=self._ttl
+        )
+
+    async def update(self, confirmation_id: str, payload: Dict[str, Any]) -> None:
+        """Overwrite a stored confirmation, keeping its TTL; no-op if it expired."""
+        await self._redis.set(
+            self._key(confirmation_id),
+            orjson.dumps(_pack(payload)),
+            xx=True,
+            keepttl=True,
+        )
+
+    async def get(self, confirmation_id: str) -> Optional[Dict[str, Any]]:
+        """Return a stored confirmation, or None if it is unknown or expired."""
+        raw = await self._redis.get(self._key(confirmation_id))
+        return _unpack(orjson.loads(raw)) if raw is not None else None
+
+    async def delete(self, confirmation_id: str) -> None:
+        """Drop a confirmation once it has been confirmed or cancelled."""
+        await self._redis.delete(self._key(confirmation_id))
+
+
+confirmation_store = ConfirmationStore(Redis.from_url(settings.redis_url))
+
+
+# How long a confirmed expense waits for others to share its INSERT
+TRANSACTION_FLUSH_SECONDS = 0.05
+
+
+class TransactionWriteBatcher:
+    """
+    Writes confirmed expenses in batches.
+
+    The first submit opens a flush window; every row submitted before it closes
+    goes out in one session, with one Default-account lookup per user and a
+    single multi-row INSERT. Each submit returns once its row is committed. If
+    the batch fails, each user's rows are retried on their own, so a submit only
+    re-raises the error of its own user's write.
+    """
+
+    def __init__(self, flush_seconds: float = TRANSACTION_FLUSH_SECONDS):
+        self._flush_seconds = flush_seconds
+        self._pending: list = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def submit(self, user_id: int, row: Dict[str, Any]) -> None:
+        """Queue a Transaction row (without user/account ids) and wait for its commit."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((user_id, row, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+        await future
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self._flush_seconds)
+        batch, self._pending = self._pending, []
+        self._flush_task = None
+
+        try:
+            await self._write(batch)
+        except Exception as e:
+            by_user: Dict[int, list] = {}
+            for entry in batch:
+                by_user.setdefault(entry[0], []).append(entry)
+            if len(by_user) == 1:
+                logger.error("Error writing %d confirmed transactions: %s", len(batch), e)
+                self._settle(batch, e)
+                return
+
+            # Don't fail every user for one bad row or account: retry each
+            # user's rows on their own so only the failing callers see the error
+            logger.warning(
+                "Batched write of %d confirmed transactions failed, retrying per user: %s",
+                len(batch),
+                e,
+            )
+            for entries in by_user.values():
+                try:
+                    await self._write(entries)
+                except Exception as user_error:
+                    logger.error(
+                        "Error writing confirmed transactions for user %s: %s",
+                        entries[0][0],
+                        user_error,
+                    )
+                    self._settle(entries, user_error)
+                else:
+                    self._settle(entries)
+            return
 
-    now = datetime.now()
-    expired_ids = []
+        self._settle(batch)
+
+    @staticmethod
+    async def _write(batch: list) -> None:
+        """Write (user_id, row, future) entries in one session and INSERT."""
+        async with async_session_maker() as session:
+            try:
+                account_ids = {}
+                for user_id in {user_id for user_id, _, _ in batch}:
+                    account = await AccountCRUD.get_or_create(
+                        session=session,
+                        user_id=user_id,
+                        name="Default",
+                        account_type=AccountType.WALLET,
+                    )
+                    account_ids[user_id] = account.id
+
+                await TransactionCRUD.create_many(
+                    session,
+                    [
+                        {**row, "user_id": user_id, "account_from_id": account_ids[user_id]}
+                        for user_id, row, _ in batch
+                    ],
+                )
+            except Exception:
+                await session.rollback()
+                raise
+
+    @staticmethod
+    def _settle(batch: list, error: Optional[BaseException] = None) -> None:
+        """Resolve the entries' futures, or fail them with ``error``."""
+        for _, _, future in batch:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
 
-    for conf_id, data in pending_confirmations.items():
-        if "created_at" in data:
-            age = now - data["created_at"]
-            if age > timedelta(minutes=10):  # 10 minute expiration
-                expired_ids.append(conf_id)
 
-    for conf_id in expired_ids:
-        del pending_confirmations[conf_id]
-        logger.info(f"Cleaned up expired confirmation: {conf_id}")
+transaction_batcher = TransactionWriteBatcher()
 
-    if expired_ids:
-        logger.info(f"Cleaned up {len(expired_ids)} expired confirmations")
+# Telegram user id -> user id. Only hits are cached, so a user who runs /start
+# after a miss is found on their next message.
+_user_ids: TTLCache = TTLCache(maxsize=50_000, ttl=300)
+
+
+async def _resolve_user_id(telegram_user_id: str) -> Optional[int]:
+    """Return the user id for a Telegram user, or None if they are not registered."""
+    user_id = _user_ids.get(telegram_user_id)
+    if user_id is None:
+        # Column-only query: no User instance ends up in the identity map
+        async with async_session_maker() as session:
+            user_id = await UserCRUD.get_id_by_telegram_id(session, telegram_user_id)
+        if user_id is None:
+            return None
+        _user_ids[telegram_user_id] = user_id
+    return user_id
 
 
 # Initialize audio transcription service
@@ -70,37 +272,55 @@ except ImportError:
     audio_service = None
 
 
+# Telegram's limit on message text length
+MAX_MESSAGE_LENGTH = 4096
+
+
+def _split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> list:
+    """Split text into messages of at most ``limit`` chars, at paragraph breaks if possible."""
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind("\n\n", 0, limit)
+        if cut <= 0:
+            cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    parts.append(text)
+    return parts
+
+
 @financial_router.message(Command("analyze"))
 async def cmd_analyze(message: Message, state: FSMContext):
     """Handle /analyze command for financial analysis."""
     try:
         # Get user from database
-        async with async_session_maker() as session:
-            user = await UserCRUD.get_by_telegram_id(session, str(message.from_user.id))
-            if not user:
-                await message.answer("❌ User not found. Please use /start first.")
-                return
+        user_id = await _resolve_user_id(str(message.from_user.id))
+        if not user_id:
+            await message.answer("❌ User not found. Please use /start first.")
+            return
 
         # Extract period from command arguments
         args = message.text.split()[1:] if message.text else []
         period_text = " ".join(args) if args else "last month"
 
         # Generate analysis
-        analysis = await financial_agent.analyze_period(period_text, user.id)
+        analysis = await financial_agent.analyze_period(period_text, user_id)
 
-        # Format response
+        # Format response, with recommendations in the same message if any
         response = _format_analysis_response(analysis)
-        await message.answer(response, parse_mode="HTML")
-
-        # Send recommendations if any
         if analysis["recommendations"]:
             rec_text = _format_recommendations(
                 analysis["recommendations"], analysis["resolved_language"]
             )
-            await message.answer(rec_text, parse_mode="HTML")
+            response = f"{response}\n\n{rec_text}"
+
+        for part in _split_message(response):
+            await message.answer(part, parse_mode="HTML")
 
     except Exception as e:
-        logger.error(f"Error in analyze command: {e}")
+        logger.error("Error in analyze command: %s", e)
         language = detect_language(message.text or "")
         error_msg = Messages.get("error", "general_error", language, error=str(e))
         await message.answer(error_msg)
@@ -109,6 +329,8 @@ async def cmd_analyze(message: Message, state: FSMContext):
 @financial_router.message(F.voice)
 async def handle_voice_expense(message: Message, state: FSMContext):
     """Handle voice messages for expense entry."""
+    user_language = "en"  # Default
+    processing_msg = None
     try:
         # Check if audio transcription is available
         if not audio_service or not audio_service.api_key:
@@ -134,15 +356,13 @@ async def handle_voice_expense(message: Message, state: FSMContext):
             return
 
         # Get user from database
-        async with async_session_maker() as session:
-            user = await UserCRUD.get_by_telegram_id(session, str(message.from_user.id))
-            if not user:
-                await message.answer("❌ User not found. Please use /start first.")
-                return
+        user_id = await _resolve_user_id(str(message.from_user.id))
+        if not user_id:
+            await message.answer("❌ User not found. Please use /start first.")
+            return
 
         # Determine language hint from user's language or previous messages
         language_hint = None
-        user_language = "en"  # Default
         if message.from_user.language_code:
             if message.from_user.language_code.startswith("es"):
                 language_hint = "es"
@@ -182,27 +402,12 @@ async def handle_voice_expense(message: Message, state: FSMContext):
                     )
                 return
 
-            # Edit the processing message to show transcription
-            transcription_preview = (
-                transcription[:100] + "..."
-                if len(transcription) > 100
-                else transcription
-            )
-            if user_language == "es":
-                await processing_msg.edit_text(
-                    f'🎤➡️📝 Transcrito: "{transcription_preview}"'
-                )
-            else:
-                await processing_msg.edit_text(
-                    f'🎤➡️📝 Transcribed: "{transcription_preview}"'
-                )
-
             # Parse the transcription for expense information
-            expense_data = await _parse_voice_expense(transcription, user.id)
+            expense_data = await _parse_voice_expense(transcription, user_id)
 
             if not expense_data:
                 if user_language == "es":
-                    await message.answer(
+                    await processing_msg.edit_text(
                         f"🤔 No pude encontrar información de gasto en:\n\n"
                         f'"{transcription}"\n\n'
                         "Intenta incluir:\n"
@@ -211,7 +416,7 @@ async def handle_voice_expense(message: Message, state: FSMContext):
                         'Ejemplo: "Gasté 50 dólares en Starbucks para café"'
                     )
                 else:
-                    await message.answer(
+                    await processing_msg.edit_text(
                         f"🤔 I couldn't find expense information in:\n\n"
                         f'"{transcription}"\n\n'
                         "Try including:\n"
@@ -224,26 +429,21 @@ async def handle_voice_expense(message: Message, state: FSMContext):
             # Process the expense using the financial agent
             # Detect language from the actual transcription text (not user settings)
             # This handles cases where Whisper transcribes Spanish -> English
-            from libs.utils.language import detect_language
             detected_lang = detect_language(transcription)
             expense_data["language"] = detected_lang
             confirmation = await financial_agent.process_expense_confirmation(
                 **expense_data
             )
 
-            # Store confirmation for callback with more unique ID
-            import time
-
-            confirmation_id = f"{user.id}_{int(time.time() * 1000)}"  # Use milliseconds for better uniqueness
-            pending_confirmations[confirmation_id] = {
-                "confirmation": confirmation,
-                "user_id": user.id,
-                "original_transcription": transcription,
-                "created_at": datetime.now(),
-            }
-            logger.info(f"Stored confirmation with ID: {confirmation_id}")
+            # Store confirmation for callback under a random ID
+            confirmation_id = f"{user_id}_{secrets.token_urlsafe(6)}"
+            await confirmation_store.set(
+                confirmation_id,
+                {"confirmation": confirmation, "user_id": user_id},
+            )
+            logger.info("Stored confirmation with ID: %s", confirmation_id)
 
-            # Send confirmation message with buttons
+            # Build confirmation message with buttons
             keyboard = _build_expense_confirmation_keyboard(
                 confirmation_id, confirmation
             )
@@ -252,18 +452,19 @@ async def handle_voice_expense(message: Message, state: FSMContext):
             # Add transcription info to the response
             language = confirmation["resolved_language"]
             if language == "es":
-                transcription_info = f'🎤 Mensaje de voz: "{transcription}"\n\n'
+                transcription_info = f'🎤 Mensaje de voz: "{html.escape(transcription, quote=False)}"\n\n'
             else:
-                transcription_info = f'🎤 Voice message: "{transcription}"\n\n'
+                transcription_info = f'🎤 Voice message: "{html.escape(transcription, quote=False)}"\n\n'
 
             full_response = transcription_info + response
 
-            await message.answer(
+            # The processing indicator becomes the confirmation itself
+            await processing_msg.edit_text(
                 full_response, reply_markup=keyboard, parse_mode="HTML"
             )
 
-        except Exception as e:
-            logger.error(f"Error processing voice message: {e}")
+        except (TelegramAPIError, RedisError) as e:
+            logger.error("Error processing voice message: %s", e)
             error_msg = (
                 "❌ Error al procesar mensaje de voz"
                 if user_language == "es"
@@ -272,144 +473,17 @@ async def handle_voice_expense(message: Message, state: FSMContext):
             await processing_msg.edit_text(f"{error_msg}: {str(e)}")
 
     except Exception as e:
-        logger.error(f"Error in voice handler: {e}")
+        logger.error("Error in voice handler: %s", e)
         error_msg = (
             "❌ Error procesando audio"
             if user_language == "es"
             else "❌ Error processing audio"
         )
-        await message.answer(error_msg)
-
-
-# DISABLED: Interferes with Spanish processing
-# @financial_router.message(F.text & ~F.text.startswith("/"))
-async def handle_text_expense(message: Message, state: FSMContext):
-    """Handle text messages that might be expenses for enhanced processing."""
-    # DISABLED: Return early to prevent interference
-    return
-    try:
-        # Check if this looks like an expense message, but ONLY process very specific patterns
-        # to avoid interfering with the original agent that handles Spanish well
-        text = message.text.lower()
-
-        # Only process messages that explicitly mention specific analysis keywords
-        # This prevents interference with the original agent's Spanish processing
-        analysis_indicators = [
-            "analyze",
-            "análisis",
-            "analizar",
-            "categorize",
-            "categorizar",
-            "budget",
-            "presupuesto",
-            "classify",
-            "clasificar",
-        ]
-
-        # Check for explicit Financial Analysis Agent keywords
-        should_use_financial_agent = any(
-            indicator in text for indicator in analysis_indicators
-        )
-
-        # If this doesn't contain analysis keywords, let the original agent handle it
-        if not should_use_financial_agent:
-            # Get user from database
-            async with async_session_maker() as session:
-                user = await UserCRUD.get_by_telegram_id(
-                    session, str(message.from_user.id)
-                )
-                if not user:
-                    await message.answer("❌ User not found. Please use /start first.")
-                    return
-
-            # Show processing indicator
-            language = detect_language(message.text)
-            if language == "es":
-                processing_msg = await message.answer("💭 Procesando gasto...")
-            else:
-                processing_msg = await message.answer("💭 Processing expense...")
-
-            # Parse the text for expense information
-            logger.info(f"Parsing text expense: '{message.text}' for user {user.id}")
-            expense_data = await _parse_text_expense(message.text, user.id)
-            logger.info(f"Parsed expense data: {expense_data}")
-
-            if not expense_data:
-                logger.info(
-                    "No expense data extracted, falling back to original bot processing"
-                )
-                # Delete processing message and fall back to original bot processing
-                await processing_msg.delete()
-                return
-
-            # Process the expense using the financial agent
-            logger.info(f"Processing expense data: {expense_data}")
-            try:
-                # Add language to expense_data
-                expense_data["language"] = language
-                confirmation = await financial_agent.process_expense_confirmation(
-                    **expense_data
-                )
-                logger.info(
-                    f"Expense confirmation received: {confirmation.get('type', 'unknown')}"
-                )
-            except Exception as e:
-                logger.error(f"Error in process_expense_confirmation: {e}")
-                await processing_msg.edit_text(
-                    f"❌ Error al procesar el gasto: {str(e)}"
-                )
-                return
-
-            # Store confirmation for callback with more unique ID
-            import time
-
-            confirmation_id = f"{user.id}_{int(time.time() * 1000)}"
-            pending_confirmations[confirmation_id] = {
-                "confirmation": confirmation,
-                "user_id": user.id,
-                "created_at": datetime.now(),
-                "original_text": message.text,
-            }
-            logger.info(f"Stored text expense confirmation with ID: {confirmation_id}")
-
-            # Send confirmation message with enhanced buttons
-            keyboard = _build_expense_confirmation_keyboard(
-                confirmation_id, confirmation
-            )
-            response = _format_expense_confirmation(confirmation)
-
-            # Add text source info to the response
-            language = confirmation["resolved_language"]
-            if language == "es":
-                text_info = f'📝 Mensaje: "{message.text}"\n\n'
-            else:
-                text_info = f'📝 Text message: "{message.text}"\n\n'
-
-            full_response = text_info + response
-
-            # Delete the processing message and send the confirmation
-            await processing_msg.delete()
-            await message.answer(
-                full_response, reply_markup=keyboard, parse_mode="HTML"
-            )
-            return
-
-        # If not an expense, let the original bot handle it by not handling the message
-
-    except Exception as e:
-        logger.error(f"Error in text expense handler: {e}")
-        # Show error to user instead of silently failing
-        try:
-            if "processing_msg" in locals():
-                await processing_msg.edit_text(f"❌ Error procesando gasto: {str(e)}")
-            else:
-                await message.answer(f"❌ Error procesando gasto: {str(e)}")
-        except:
-            # If even error reporting fails, try basic message
-            try:
-                await message.answer("❌ Error interno procesando gasto")
-            except:
-                pass
+        # Resolve the processing indicator rather than leaving it behind
+        if processing_msg is not None:
+            await processing_msg.edit_text(error_msg)
+        else:
+            await message.answer(error_msg)
 
 
 @financial_router.message(Command("expense"))
@@ -417,11 +491,10 @@ async def cmd_expense(message: Message, state: FSMContext):
     """Handle /expense command for quick expense entry."""
     try:
         # Get user from database
-        async with async_session_maker() as session:
-            user = await UserCRUD.get_by_telegram_id(session, str(message.from_user.id))
-            if not user:
-                await message.answer("❌ User not found. Please use /start first.")
-                return
+        user_id = await _resolve_user_id(str(message.from_user.id))
+        if not user_id:
+            await message.answer("❌ User not found. Please use /start first.")
+            return
 
         # Parse command arguments
         args = message.text.split()[1:] if message.text else []
@@ -437,7 +510,7 @@ async def cmd_expense(message: Message, state: FSMContext):
                 )
             return
 
-        amount = float(args[0])
+        amount = Decimal(args[0])
         currency = args[1].upper()
         merchant = args[2]
         note = " ".join(args[3:]) if len(args) > 3 else ""
@@ -452,20 +525,17 @@ async def cmd_expense(message: Message, state: FSMContext):
             date=None,  # Use today
             merchant=merchant,
             note=note,
-            user_id=user.id,
+            user_id=user_id,
             language=language,
         )
 
-        # Store confirmation for callback with more unique ID
-        import time
-
-        confirmation_id = f"{user.id}_{int(time.time() * 1000)}"  # Use milliseconds for better uniqueness
-        pending_confirmations[confirmation_id] = {
-            "confirmation": confirmation,
-            "user_id": user.id,
-            "created_at": datetime.now(),
-        }
-        logger.info(f"Stored confirmation with ID: {confirmation_id}")
+        # Store confirmation for callback under a random ID
+        confirmation_id = f"{user_id}_{secrets.token_urlsafe(6)}"
+        await confirmation_store.set(
+            confirmation_id,
+            {"confirmation": confirmation, "user_id": user_id},
+        )
+        logger.info("Stored confirmation with ID: %s", confirmation_id)
 
         # Send confirmation message with buttons
         keyboard = _build_expense_confirmation_keyboard(confirmation_id, confirmation)
@@ -473,12 +543,12 @@ async def cmd_expense(message: Message, state: FSMContext):
 
         await message.answer(response, reply_markup=keyboard, parse_mode="HTML")
 
-    except ValueError:
+    except (InvalidOperation, ValueError):
         language = detect_language(message.text or "")
         error_msg = Messages.get("error", "validation_error", language)
         await message.answer(error_msg)
     except Exception as e:
-        logger.error(f"Error in expense command: {e}")
+        logger.error("Error in expense command: %s", e)
         language = detect_language(message.text or "")
         error_msg = Messages.get("error", "general_error", language, error=str(e))
         await message.answer(error_msg)
@@ -489,11 +559,10 @@ async def cmd_budget(message: Message, state: FSMContext):
     """Handle /budget command for budget management."""
     try:
         # Get user from database
-        async with async_session_maker() as session:
-            user = await UserCRUD.get_by_telegram_id(session, str(message.from_user.id))
-            if not user:
-                await message.answer("❌ User not found. Please use /start first.")
-                return
+        user_id = await _resolve_user_id(str(message.from_user.id))
+        if not user_id:
+            await message.answer("❌ User not found. Please use /start first.")
+            return
 
         # Extract budget text from command arguments
         args = message.text.split()[1:] if message.text else []
@@ -512,41 +581,171 @@ async def cmd_budget(message: Message, state: FSMContext):
         budget_text = " ".join(args)
 
         # Update budget
-        budget_update = await financial_agent.update_budget(budget_text, user.id)
+        budget_update = await financial_agent.update_budget(budget_text, user_id)
 
         # Format response
         response = _format_budget_response(budget_update)
         await message.answer(response, parse_mode="HTML")
 
     except Exception as e:
-        logger.error(f"Error in budget command: {e}")
+        logger.error("Error in budget command: %s", e)
         language = detect_language(message.text or "")
         error_msg = Messages.get("error", "general_error", language, error=str(e))
         await message.answer(error_msg)
 
 
+# expense_<action>_<confirmation_id>, or expense_setcat<Category>_<confirmation_id>
+# for category picks. Confirmation ids are <user_id>_<token>, where the token is
+# secrets.token_urlsafe(6): always 8 characters. Pinning its length and anchoring
+# the id at the end leaves category names free to hold underscores and digits.
+_CALLBACK_RE = re.compile(
+    r"expense_(?:setcat(?P<category>.+?)|(?P<action>[a-z]+))_(?P<confirmation_id>\d+_[\w-]{8})$"
+)
+
+
+async def _do_confirm(
+    callback: CallbackQuery, confirmation_id: str, pending_data: Dict[str, Any]
+) -> None:
+    confirmation = pending_data["confirmation"]
+
+    # Create the transaction
+    await _create_confirmed_transaction(confirmation, pending_data["user_id"])
+
+    # Send success message
+    language = confirmation["resolved_language"]
+    expense = confirmation["expense"]
+    if language == "es":
+        success_msg = f"✅ Gasto registrado: -{expense['amount']:,.0f} {expense['currency']} en {expense['merchant']}"
+    else:
+        success_msg = f"✅ Expense registered: -{expense['amount']:,.0f} {expense['currency']} at {expense['merchant']}"
+
+    await callback.message.edit_text(success_msg)
+    await callback.answer("✅ Transaction confirmed!")
+
+    # Clean up
+    await confirmation_store.delete(confirmation_id)
+
+
+async def _do_category(
+    callback: CallbackQuery, confirmation_id: str, pending_data: Dict[str, Any]
+) -> None:
+    confirmation = pending_data["confirmation"]
+
+    # Show category selection
+    alternatives = confirmation["classification"]["alternatives"]
+    keyboard = _build_category_selection_keyboard(confirmation_id, alternatives)
+
+    language = confirmation["resolved_language"]
+    prompt = "Select category:" if language == "en" else "Selecciona categoría:"
+
+    await callback.message.edit_reply_markup(reply_markup=keyboard)
+    await callback.answer(prompt)
+
+
+async def _do_back(
+    callback: CallbackQuery, confirmation_id: str, pending_data: Dict[str, Any]
+) -> None:
+    # Leave category selection without changing anything
+    keyboard = _build_expense_confirmation_keyboard(
+        confirmation_id, pending_data["confirmation"]
+    )
+    await callback.message.edit_reply_markup(reply_markup=keyboard)
+    await callback.answer()
+
+
+async def _do_necessity(
+    callback: CallbackQuery, confirmation_id: str, pending_data: Dict[str, Any]
+) -> None:
+    confirmation = pending_data["confirmation"]
+
+    # Toggle necessity flag
+    current_necessity = confirmation["classification"]["is_necessary"]
+    confirmation["classification"]["is_necessary"] = not current_necessity
+    await confirmation_store.update(confirmation_id, pending_data)
+
+    # Update UI text
+    new_text = _format_expense_confirmation(confirmation)
+    keyboard = _build_expense_confirmation_keyboard(confirmation_id, confirmation)
+
+    await callback.message.edit_text(new_text, reply_markup=keyboard, parse_mode="HTML")
+    await callback.answer("✅ Necessity updated!")
+
+
+async def _do_set_category(
+    callback: CallbackQuery,
+    confirmation_id: str,
+    pending_data: Dict[str, Any],
+    category: str,
+) -> None:
+    confirmation = pending_data["confirmation"]
+
+    # Set specific category
+    confirmation["classification"]["category"] = category
+    await confirmation_store.update(confirmation_id, pending_data)
+
+    # Update UI
+    new_text = _format_expense_confirmation(confirmation)
+    keyboard = _build_expense_confirmation_keyboard(confirmation_id, confirmation)
+
+    await callback.message.edit_text(new_text, reply_markup=keyboard, parse_mode="HTML")
+    await callback.answer(f"✅ Category set to {category}")
+
+
+async def _do_cancel(
+    callback: CallbackQuery, confirmation_id: str, pending_data: Dict[str, Any]
+) -> None:
+    # Cancel the transaction
+    language = pending_data["confirmation"]["resolved_language"]
+    cancel_msg = (
+        "❌ Transaction cancelled." if language == "en" else "❌ Transacción cancelada."
+    )
+
+    await callback.message.edit_text(cancel_msg)
+    await callback.answer("Transaction cancelled")
+
+    # Clean up
+    await confirmation_store.delete(confirmation_id)
+
+
+_CALLBACK_ACTIONS = {
+    "confirm": _do_confirm,
+    "category": _do_category,
+    "back": _do_back,
+    "necessity": _do_necessity,
+    "cancel": _do_cancel,
+}
+
+
 @financial_router.callback_query(F.data.startswith("expense_"))
 async def handle_expense_callback(callback: CallbackQuery):
     """Handle expense confirmation callbacks."""
     try:
-        data_parts = callback.data.split("_", 2)  # Split only on first 2 underscores
-        action = data_parts[1]  # confirm, category, necessity
-        confirmation_id = data_parts[
-            2
-        ]  # This will be the full confirmation_id including underscores
+        match = _CALLBACK_RE.fullmatch(callback.data)
+        if not match:
+            logger.warning("Malformed expense callback data: %s", callback.data)
+            await callback.answer()
+            return
 
-        logger.info(
-            f"Callback received: action={action}, confirmation_id={confirmation_id}"
+        action, category, confirmation_id = match.group(
+            "action", "category", "confirmation_id"
         )
+        handler = _CALLBACK_ACTIONS.get(action) if category is None else None
+        if category is None and handler is None:
+            logger.warning("Unknown expense callback action: %s", action)
+            await callback.answer()
+            return
 
-        # Clean up any expired confirmations
-        cleanup_expired_confirmations()
+        logger.info(
+            "Callback received: action=%s, confirmation_id=%s",
+            action or "setcat",
+            confirmation_id,
+        )
 
-        logger.info(f"Available confirmations: {list(pending_confirmations.keys())}")
+        pending_data = await confirmation_store.get(confirmation_id)
 
-        if confirmation_id not in pending_confirmations:
+        if pending_data is None:
             logger.warning(
-                f"Confirmation ID {confirmation_id} not found in pending confirmations"
+                "Confirmation ID %s not found in pending confirmations", confirmation_id
             )
             # Try to detect language for error message
             language = (
@@ -563,122 +762,48 @@ async def handle_expense_callback(callback: CallbackQuery):
             await callback.answer(error_msg)
             return
 
-        pending_data = pending_confirmations[confirmation_id]
-        confirmation = pending_data["confirmation"]
-        user_id = pending_data["user_id"]
-
-        if action == "confirm":
-            # Create the transaction
-            await _create_confirmed_transaction(confirmation, user_id)
-
-            # Send success message
-            language = confirmation["resolved_language"]
-            expense = confirmation["expense"]
-            if language == "es":
-                success_msg = f"✅ Gasto registrado: -{expense['amount']:,.0f} {expense['currency']} en {expense['merchant']}"
-            else:
-                success_msg = f"✅ Expense registered: -{expense['amount']:,.0f} {expense['currency']} at {expense['merchant']}"
-
-            await callback.message.edit_text(success_msg, parse_mode="HTML")
-            await callback.answer("✅ Transaction confirmed!")
-
-            # Clean up
-            del pending_confirmations[confirmation_id]
-
-        elif action == "category":
-            # Show category selection
-            alternatives = confirmation["classification"]["alternatives"]
-            keyboard = _build_category_selection_keyboard(confirmation_id, alternatives)
-
-            language = confirmation["resolved_language"]
-            prompt = "Select category:" if language == "en" else "Selecciona categoría:"
-
-            await callback.message.edit_reply_markup(reply_markup=keyboard)
-            await callback.answer(prompt)
-
-        elif action == "necessity":
-            # Toggle necessity flag
-            current_necessity = confirmation["classification"]["is_necessary"]
-            confirmation["classification"]["is_necessary"] = not current_necessity
-
-            # Update UI text
-            new_text = _format_expense_confirmation(confirmation)
-            keyboard = _build_expense_confirmation_keyboard(
-                confirmation_id, confirmation
-            )
-
-            await callback.message.edit_text(
-                new_text, reply_markup=keyboard, parse_mode="HTML"
+        if category is not None:
+            await _do_set_category(
+                callback, confirmation_id, pending_data, category.replace("_", " ")
             )
-            await callback.answer("✅ Necessity updated!")
-
-        elif action.startswith("setcat"):
-            # Set specific category
-            category = action.replace("setcat", "").replace("_", " ")
-            confirmation["classification"]["category"] = category
-
-            # Update UI
-            new_text = _format_expense_confirmation(confirmation)
-            keyboard = _build_expense_confirmation_keyboard(
-                confirmation_id, confirmation
-            )
-
-            await callback.message.edit_text(
-                new_text, reply_markup=keyboard, parse_mode="HTML"
-            )
-            await callback.answer(f"✅ Category set to {category}")
-
-        elif action == "cancel":
-            # Cancel the transaction
-            language = confirmation["resolved_language"]
-            cancel_msg = (
-                "❌ Transaction cancelled."
-                if language == "en"
-                else "❌ Transacción cancelada."
-            )
-
-            await callback.message.edit_text(cancel_msg)
-            await callback.answer("Transaction cancelled")
-
-            # Clean up
-            del pending_confirmations[confirmation_id]
+        else:
+            await handler(callback, confirmation_id, pending_data)
 
     except Exception as e:
-        logger.error(f"Error in expense callback: {e}")
+        logger.error("Error in expense callback: %s", e)
         await callback.answer("❌ Error processing request")
 
 
+# (text, action) rows of the confirmation keyboard per language
+_CONFIRMATION_KB_TEMPLATE = {
+    "en": (
+        (("✅ Confirm", "confirm"), ("🏷️ Category", "category")),
+        (("🔄 Toggle Necessity", "necessity"),),
+        (("❌ Cancel", "cancel"),),
+    ),
+    "es": (
+        (("✅ Confirmar", "confirm"), ("🏷️ Categoría", "category")),
+        (("🔄 Cambiar Necesidad", "necessity"),),
+        (("❌ Cancelar", "cancel"),),
+    ),
+}
+
+
 def _build_expense_confirmation_keyboard(
     confirmation_id: str, confirmation: Dict[str, Any]
 ) -> InlineKeyboardMarkup:
     """Build keyboard for expense confirmation."""
     language = confirmation["resolved_language"]
+    rows = _CONFIRMATION_KB_TEMPLATE["en" if language == "en" else "es"]
 
     buttons = [
         [
             InlineKeyboardButton(
-                text="✅ Confirm" if language == "en" else "✅ Confirmar",
-                callback_data=f"expense_confirm_{confirmation_id}",
-            ),
-            InlineKeyboardButton(
-                text="🏷️ Category" if language == "en" else "🏷️ Categoría",
-                callback_data=f"expense_category_{confirmation_id}",
-            ),
-        ],
-        [
-            InlineKeyboardButton(
-                text="🔄 Toggle Necessity"
-                if language == "en"
-                else "🔄 Cambiar Necesidad",
-                callback_data=f"expense_necessity_{confirmation_id}",
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                text="❌ Cancel" if language == "en" else "❌ Cancelar",
-                callback_data=f"expense_cancel_{confirmation_id}",
+                text=text, callback_data=f"expense_{action}_{confirmation_id}"
             )
-        ],
+            for text, action in row
+        ]
+        for row in rows
     ]
 
     return InlineKeyboardMarkup(inline_keyboard=buttons)
@@ -715,6 +840,78 @@ def _build_category_selection_keyboard(
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+# Message templates, parsed once at import; re-rendered on every callback edit
+_ES_EXPENSE_TMPL = Template("""
+🔔 <b>Confirmación de Gasto</b>
+
+<b>Monto:</b> $amount $currency
+<b>Comercio:</b> $merchant
+<b>Descripción:</b> $note
+<b>Fecha:</b> $date
+
+<b>Categoría:</b> $category ($confidence)
+<b>Necesidad:</b> $necessity
+
+¿Confirmar esta transacción?
+""")
+_EN_EXPENSE_TMPL = Template("""
+🔔 <b>Expense Confirmation</b>
+
+<b>Amount:</b> $amount $currency
+<b>Merchant:</b> $merchant
+<b>Description:</b> $note
+<b>Date:</b> $date
+
+<b>Category:</b> $category ($confidence)
+<b>Necessity:</b> $necessity
+
+Confirm this transaction?
+""")
+
+_ES_ANALYSIS_TMPL = Template(
+    "📊 <b>Análisis Financiero</b>\n<b>Período:</b> $start a $end\n"
+    "\n$summary"
+    "\n<b>📋 Adherencia al Presupuesto:</b>\n"
+    "• Fijo: $fixed% (objetivo $fixed_target%)\n"
+    "• Variable necesario: $variable_necessary% (objetivo $variable_necessary_target%)\n"
+    "• Discrecional: $discretionary% (objetivo $discretionary_target%)\n"
+)
+_EN_ANALYSIS_TMPL = Template(
+    "📊 <b>Financial Analysis</b>\n<b>Period:</b> $start to $end\n"
+    "\n$summary"
+    "\n<b>📋 Budget Adherence:</b>\n"
+    "• Fixed: $fixed% (target $fixed_target%)\n"
+    "• Variable necessary: $variable_necessary% (target $variable_necessary_target%)\n"
+    "• Discretionary: $discretionary% (target $discretionary_target%)\n"
+)
+_ES_BUDGET_TMPL = Template(
+    "💰 <b>Presupuesto Actualizado</b>\n\n"
+    "🏠 Fijo: $fixed%\n"
+    "🛒 Variable necesario: $variable_necessary%\n"
+    "🎯 Discrecional: $discretionary%\n"
+)
+_EN_BUDGET_TMPL = Template(
+    "💰 <b>Budget Updated</b>\n\n"
+    "🏠 Fixed: $fixed%\n"
+    "🛒 Variable necessary: $variable_necessary%\n"
+    "🎯 Discretionary: $discretionary%\n"
+)
+
+# Per-language lookup tables (resolved_language is always "es" or "en")
+_EXPENSE_TMPL = {"es": _ES_EXPENSE_TMPL, "en": _EN_EXPENSE_TMPL}
+_ANALYSIS_TMPL = {"es": _ES_ANALYSIS_TMPL, "en": _EN_ANALYSIS_TMPL}
+_BUDGET_TMPL = {"es": _ES_BUDGET_TMPL, "en": _EN_BUDGET_TMPL}
+_BUDGET_NOTES_HEADER = {"es": "\n<b>Notas:</b>\n", "en": "\n<b>Notes:</b>\n"}
+_RECOMMENDATIONS_HEADER = {
+    "es": "💡 <b>Recomendaciones:</b>\n\n",
+    "en": "💡 <b>Recommendations:</b>\n\n",
+}
+_SAVINGS_FMT = {
+    "es": "   💰 Ahorro estimado: ${:,.0f}/mes\n",
+    "en": "   💰 Estimated savings: ${:,.0f}/month\n",
+}
+
+
 def _format_expense_confirmation(confirmation: Dict[str, Any]) -> str:
     """Format expense confirmation message."""
     expense = confirmation["expense"]
@@ -726,72 +923,36 @@ def _format_expense_confirmation(confirmation: Dict[str, Any]) -> str:
         "es": "necesario" if classification["is_necessary"] else "no necesario",
     }
 
-    confidence_text = f"({classification['confidence']:.0%})"
-
-    if language == "es":
-        return f"""
-🔔 <b>Confirmación de Gasto</b>
-
-<b>Monto:</b> {expense["amount"]:,.0f} {expense["currency"]}
-<b>Comercio:</b> {expense["merchant"]}
-<b>Descripción:</b> {expense["note"] or "N/A"}
-<b>Fecha:</b> {expense["date"]}
-
-<b>Categoría:</b> {classification["category"]} {confidence_text}
-<b>Necesidad:</b> {necessity_text[language]}
-
-¿Confirmar esta transacción?
-"""
-    else:
-        return f"""
-🔔 <b>Expense Confirmation</b>
-
-<b>Amount:</b> {expense["amount"]:,.0f} {expense["currency"]}
-<b>Merchant:</b> {expense["merchant"]}
-<b>Description:</b> {expense["note"] or "N/A"}
-<b>Date:</b> {expense["date"]}
-
-<b>Category:</b> {classification["category"]} {confidence_text}
-<b>Necessity:</b> {necessity_text[language]}
-
-Confirm this transaction?
-"""
+    return _EXPENSE_TMPL[language].substitute(
+        amount=f"{expense['amount']:,.0f}",
+        currency=expense["currency"],
+        merchant=html.escape(expense["merchant"], quote=False),
+        note=html.escape(expense["note"] or "N/A", quote=False),
+        date=expense["date"],
+        category=html.escape(classification["category"], quote=False),
+        confidence=f"{classification['confidence']:.0%}",
+        necessity=necessity_text[language],
+    )
 
 
 def _format_analysis_response(analysis: Dict[str, Any]) -> str:
     """Format financial analysis response."""
     language = analysis["resolved_language"]
     period = analysis["period"]
-    totals = analysis["totals"]
-
-    if language == "es":
-        header = f"📊 <b>Análisis Financiero</b>\n<b>Período:</b> {period['start']} a {period['end']}\n"
-    else:
-        header = f"📊 <b>Financial Analysis</b>\n<b>Period:</b> {period['start']} to {period['end']}\n"
-
-    # Add human summary
-    summary = analysis["human_summary"]
-
-    # Budget adherence
     targets = analysis["budget_targets_pct"]
     actual = analysis["budget_actual_pct"]
 
-    if language == "es":
-        budget_section = "\n<b>📋 Adherencia al Presupuesto:</b>\n"
-        budget_section += (
-            f"• Fijo: {actual['fixed']:.1f}% (objetivo {targets['fixed']:.1f}%)\n"
-        )
-        budget_section += f"• Variable necesario: {actual['variable_necessary']:.1f}% (objetivo {targets['variable_necessary']:.1f}%)\n"
-        budget_section += f"• Discrecional: {actual['discretionary']:.1f}% (objetivo {targets['discretionary']:.1f}%)\n"
-    else:
-        budget_section = "\n<b>📋 Budget Adherence:</b>\n"
-        budget_section += (
-            f"• Fixed: {actual['fixed']:.1f}% (target {targets['fixed']:.1f}%)\n"
-        )
-        budget_section += f"• Variable necessary: {actual['variable_necessary']:.1f}% (target {targets['variable_necessary']:.1f}%)\n"
-        budget_section += f"• Discretionary: {actual['discretionary']:.1f}% (target {targets['discretionary']:.1f}%)\n"
-
-    return header + "\n" + summary + budget_section
+    return _ANALYSIS_TMPL[language].substitute(
+        start=period["start"],
+        end=period["end"],
+        summary=analysis["human_summary"],
+        fixed=f"{actual['fixed']:.1f}",
+        fixed_target=f"{targets['fixed']:.1f}",
+        variable_necessary=f"{actual['variable_necessary']:.1f}",
+        variable_necessary_target=f"{targets['variable_necessary']:.1f}",
+        discretionary=f"{actual['discretionary']:.1f}",
+        discretionary_target=f"{targets['discretionary']:.1f}",
+    )
 
 
 def _format_recommendations(recommendations: list, language: str) -> str:
@@ -799,27 +960,16 @@ def _format_recommendations(recommendations: list, language: str) -> str:
     if not recommendations:
         return ""
 
-    if language == "es":
-        header = "💡 <b>Recomendaciones:</b>\n\n"
-    else:
-        header = "💡 <b>Recommendations:</b>\n\n"
-
+    savings_fmt = _SAVINGS_FMT[language]
     formatted_recs = []
     for i, rec in enumerate(recommendations, 1):
-        rec_text = f"<b>{i}. {rec['title']}</b>\n"
-        rec_text += f"   {rec['rationale']}\n"
-
-        if rec.get("est_monthly_savings"):
-            if language == "es":
-                rec_text += (
-                    f"   💰 Ahorro estimado: ${rec['est_monthly_savings']:,.0f}/mes\n"
-                )
-            else:
-                rec_text += f"   💰 Estimated savings: ${rec['est_monthly_savings']:,.0f}/month\n"
-
-        formatted_recs.append(rec_text)
+        savings = rec.get("est_monthly_savings")
+        savings_line = savings_fmt.format(savings) if savings else ""
+        formatted_recs.append(
+            f"<b>{i}. {rec['title']}</b>\n   {rec['rationale']}\n{savings_line}"
+        )
 
-    return header + "\n".join(formatted_recs)
+    return _RECOMMENDATIONS_HEADER[language] + "\n".join(formatted_recs)
 
 
 def _format_budget_response(budget_update: Dict[str, Any]) -> str:
@@ -827,45 +977,123 @@ def _format_budget_response(budget_update: Dict[str, Any]) -> str:
     language = budget_update["resolved_language"]
     percentages = budget_update["normalized_percentages"]
 
-    if language == "es":
-        response = "💰 <b>Presupuesto Actualizado</b>\n\n"
-        response += f"🏠 Fijo: {percentages['fixed']:.1f}%\n"
-        response += f"🛒 Variable necesario: {percentages['variable_necessary']:.1f}%\n"
-        response += f"🎯 Discrecional: {percentages['discretionary']:.1f}%\n"
-    else:
-        response = "💰 <b>Budget Updated</b>\n\n"
-        response += f"🏠 Fixed: {percentages['fixed']:.1f}%\n"
-        response += f"🛒 Variable necessary: {percentages['variable_necessary']:.1f}%\n"
-        response += f"🎯 Discretionary: {percentages['discretionary']:.1f}%\n"
+    response = _BUDGET_TMPL[language].substitute(
+        fixed=f"{percentages['fixed']:.1f}",
+        variable_necessary=f"{percentages['variable_necessary']:.1f}",
+        discretionary=f"{percentages['discretionary']:.1f}",
+    )
 
     # Add validation notes if any
-    if budget_update["validation_notes"]:
-        if language == "es":
-            response += "\n<b>Notas:</b>\n"
-        else:
-            response += "\n<b>Notes:</b>\n"
+    notes = budget_update["validation_notes"]
+    if not notes:
+        return response
+    return response + _BUDGET_NOTES_HEADER[language] + "".join(f"• {note}\n" for note in notes)
+
+
+# Voice expense parsing patterns, compiled once at import.
+# Currency patterns - support both symbols and names.
+# Order matters: check specific tokens before generic ones
+_CURRENCY_PATTERNS = {
+    "usdt": r"(?:usdt|tether)",  # Check USDT before USD
+    "btc": r"(?:btc|bitcoin)",
+    "usd": r"(?:usd|dollars?|bucks?|\$)",
+    "ars": r"(?:ars|pesos?|peso)",
+    "eur": r"(?:eur|euros?)",
+}
+# One alternation with a named group per currency code: a single search finds
+# the currency token and match.lastgroup names its code
+_CURRENCY_RE = re.compile(
+    "|".join(
+        f"(?P<{curr_code}>{pattern})"
+        for curr_code, pattern in _CURRENCY_PATTERNS.items()
+    ),
+    re.IGNORECASE,
+)
 
-        for note in budget_update["validation_notes"]:
-            response += f"• {note}\n"
+# Amount patterns - support various formats
+_AMOUNT_RES = [
+    re.compile(
+        pattern.format(currencies="|".join(_CURRENCY_PATTERNS.values())),
+        re.IGNORECASE,
+    )
+    for pattern in (
+        r"(\d+(?:[.,]\d+)?)\s*k\s*({currencies})",  # "50k USD"
+        r"(\d+(?:[.,]\d+)?)\s*({currencies})",  # "50 USD"
+        r"({currencies})\s*(\d+(?:[.,]\d+)?)",  # "USD 50"
+        r"(\d+(?:[.,]\d+)?)(?:\s*(?:dollars?|pesos?|euros?))",  # "50 dollars"
+    )
+]
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
 
-    return response
 
 
-async def _parse_text_expense(text: str, user_id: int) -> Optional[Dict[str, Any]]:
+def _phrase_patterns_re(prefixes: tuple, reject: Optional[str] = None) -> re.Pattern:
     """
-    Parse text message to extract expense information.
+    Compile phrase patterns into a single regex that keeps their priority.
 
-    This is similar to _parse_voice_expense but optimized for typed text.
+    Each prefix is followed by a ``phrase<i>`` group running to the next comma
+    or period. Every branch is a lookahead from the start of the text, which
+    commits to that pattern's leftmost match just as ``re.search`` would, so
+    an earlier pattern wins wherever it occurs. With ``reject``, a branch whose
+    phrase starts with it fails and the next pattern is tried.
 
-    Args:
-        text: The text message
-        user_id: User identifier
-
-    Returns:
-        Dictionary with expense data or None if parsing fails
+    This is one ``match`` call, not one pass over the text: each branch tried
+    still scans from the start, and ``reject`` adds a probe per candidate. The
+    saving is the per-pattern Python loop and call overhead.
     """
-    # Reuse the voice parsing logic since text and voice expenses have similar patterns
-    return await _parse_voice_expense(text, user_id)
+    branches = []
+    for i, prefix in enumerate(prefixes):
+        if reject:
+            probe = rf"(?P<reject{i}>(?=\s*(?:{reject})))?"
+            check = f"(?(reject{i})(?!))"
+        else:
+            probe = check = ""
+        branches.append(rf"(?=[\s\S]*?{prefix}{probe}(?P<phrase{i}>[^,.]+)){check}")
+    return re.compile("^(?:" + "|".join(branches) + ")", re.IGNORECASE)
+
+
+def _match_phrase(pattern_re: re.Pattern, text: str) -> Optional[str]:
+    """Return the stripped phrase of the first pattern that matched, if any."""
+    match = pattern_re.match(text)
+    if match is None:
+        return None
+    groups = match.groupdict()
+    for name, phrase in groups.items():
+        if (
+            phrase is not None
+            and name.startswith("phrase")
+            and groups.get("reject" + name[6:]) is None
+        ):
+            return phrase.strip()
+    return None
+
+
+# Common spending phrases in English and Spanish, in priority order; a phrase
+# that is just a currency or amount is skipped
+_SPENDING_RE = _phrase_patterns_re(
+    (
+        r"(?:spent|paid|bought|purchased)\s+.*?(?:at|from|in)\s+",  # "spent 50 at Starbucks"
+        r"(?:gasté|pagué|compré)\s+.*?(?:en|de)\s+",  # "gasté 50 en Starbucks"
+        r"(?:at|en)\s+",  # "at Starbucks"
+        r"(?:from|de)\s+",  # "from my account"
+        r"(?:for|para)\s+",  # "for coffee"
+    ),
+    reject=r"\d|usd|ars|eur|dollar|peso",
+)
+# Words that never name a merchant on their own
+_MERCHANT_STOPWORDS = frozenset({
+    "the", "and", "for", "from", "with", "spent", "paid", "bought",
+    "gasté", "pagué", "compré", "para", "con", "desde",
+})
+_MERCHANT_SKIP_RE = re.compile(r"^\d+|usd|ars|eur", re.IGNORECASE)
+
+# Descriptive phrases for the note
+_DESCRIPTIVE_RE = _phrase_patterns_re(
+    (
+        r"(?:for|para)\s+",
+        r"(?:buying|comprando)\s+",
+    )
+)
 
 
 async def _parse_voice_expense(
@@ -881,155 +1109,75 @@ async def _parse_voice_expense(
     Returns:
         Dictionary with expense data or None if parsing fails
     """
-    import re
-    from decimal import Decimal
 
     text = transcription.lower().strip()
 
-    # Currency patterns - support both symbols and names
-    # Order matters: check specific tokens before generic ones
-    currency_patterns = {
-        "usdt": r"(?:usdt|tether)",  # Check USDT before USD
-        "btc": r"(?:btc|bitcoin)",
-        "usd": r"(?:usd|dollars?|bucks?|\$)",
-        "ars": r"(?:ars|pesos?|peso)",
-        "eur": r"(?:eur|euros?)",
-    }
-
-    # Amount patterns - support various formats
-    amount_patterns = [
-        r"(\d+(?:[.,]\d+)?)\s*k\s*({currencies})",  # "50k USD"
-        r"(\d+(?:[.,]\d+)?)\s*({currencies})",  # "50 USD"
-        r"({currencies})\s*(\d+(?:[.,]\d+)?)",  # "USD 50"
-        r"(\d+(?:[.,]\d+)?)(?:\s*(?:dollars?|pesos?|euros?))",  # "50 dollars"
-    ]
-
-    # Create combined currency pattern
-    all_currencies = "|".join(currency_patterns.values())
-
     amount = None
     currency = "USD"  # Default currency
 
     # Try to find amount and currency
-    for pattern in amount_patterns:
-        pattern_with_currencies = pattern.format(currencies=all_currencies)
-        match = re.search(pattern_with_currencies, text, re.IGNORECASE)
+    for amount_re in _AMOUNT_RES:
+        match = amount_re.search(text)
 
         if match:
             groups = match.groups()
 
             # Extract amount (could be in group 1 or 2)
             amount_str = None
-            currency_str = None
 
             for group in groups:
-                if re.match(r"\d+(?:[.,]\d+)?", group):
+                if _NUMBER_RE.match(group):
                     amount_str = group.replace(",", ".")
-                else:
-                    # Check if this group contains currency info
-                    for curr_code, pattern in currency_patterns.items():
-                        if re.search(pattern, group, re.IGNORECASE):
-                            currency_str = group.lower()
-                            currency = curr_code.upper()
-                            break
 
             if amount_str:
                 try:
-                    amount = float(amount_str)
+                    amount = Decimal(amount_str)
 
                     # Handle "k" multiplier
                     if "k" in match.group(0).lower():
                         amount *= 1000
 
-                    # If no currency detected in groups, search the whole match
-                    if currency == "USD":  # Still default
-                        for curr_code, pattern in currency_patterns.items():
-                            if re.search(pattern, match.group(0), re.IGNORECASE):
-                                currency = curr_code.upper()
-                                break
+                    # Apart from the amount, the match holds only the currency
+                    # token, so one search over it finds the currency
+                    currency_match = _CURRENCY_RE.search(match.group(0))
+                    if currency_match:
+                        currency = currency_match.lastgroup.upper()
 
                     break
-                except ValueError:
+                except InvalidOperation:
                     continue
 
     if not amount:
         return None
 
     # Extract merchant/location information
-    merchant = ""
+    merchant = _match_phrase(_SPENDING_RE, text) or ""
     note = ""
 
-    # Common spending phrases in English and Spanish
-    spending_patterns = [
-        r"(?:spent|paid|bought|purchased)\s+.*?(?:at|from|in)\s+([^,.]+)",  # "spent 50 at Starbucks"
-        r"(?:gasté|pagué|compré)\s+.*?(?:en|de)\s+([^,.]+)",  # "gasté 50 en Starbucks"
-        r"(?:at|en)\s+([^,.]+)",  # "at Starbucks"
-        r"(?:from|de)\s+([^,.]+)",  # "from my account"
-        r"(?:for|para)\s+([^,.]+)",  # "for coffee"
-    ]
-
-    for pattern in spending_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            extracted = match.group(1).strip()
-
-            # Skip if it's just a currency or amount
-            if not re.match(
-                r"^\d+|usd|ars|eur|dollars?|pesos?", extracted, re.IGNORECASE
-            ):
-                if not merchant:
-                    merchant = extracted
-                elif extracted not in merchant.lower():
-                    note = extracted
-                break
-
     # If no merchant found, try to extract from general context
     if not merchant:
-        # Look for standalone words that could be merchants
-        words = text.split()
-        potential_merchants = []
-
-        for word in words:
-            # Skip common words and currencies
-            if (
-                len(word) > 2
-                and word
-                not in [
-                    "the",
-                    "and",
-                    "for",
-                    "from",
-                    "with",
-                    "spent",
-                    "paid",
-                    "bought",
-                    "gasté",
-                    "pagué",
-                    "compré",
-                    "para",
-                    "con",
-                    "desde",
-                ]
-                and not re.match(r"^\d+|usd|ars|eur", word, re.IGNORECASE)
-            ):
-                potential_merchants.append(word.title())
+        # Look for standalone words that could be merchants, skipping common
+        # words and currencies; stop after the first 2
+        potential_merchants = list(
+            islice(
+                (
+                    word.title()
+                    for word in text.split()
+                    if len(word) > 2
+                    and word not in _MERCHANT_STOPWORDS
+                    and not _MERCHANT_SKIP_RE.match(word)
+                ),
+                2,
+            )
+        )
 
         if potential_merchants:
-            merchant = " ".join(potential_merchants[:2])  # Take first 2 words
+            merchant = " ".join(potential_merchants)
 
     # Create note from remaining context
     if not note:
         # Look for descriptive phrases
-        descriptive_patterns = [
-            r"(?:for|para)\s+([^,.]+)",
-            r"(?:buying|comprando)\s+([^,.]+)",
-        ]
-
-        for pattern in descriptive_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                note = match.group(1).strip()
-                break
+        note = _match_phrase(_DESCRIPTIVE_RE, text) or ""
 
     # If still no merchant, use a generic description
     if not merchant:
@@ -1053,34 +1201,28 @@ async def _create_confirmed_transaction(
     expense = confirmation["expense"]
     classification = confirmation["classification"]
 
-    # Update user memory with any changes
-    await financial_agent.update_user_memory(
-        user_id=user_id,
-        merchant=expense["merchant"],
-        category=classification["category"],
-        is_necessary=classification["is_necessary"],
+    # Queue the row; presses within one flush window share a single INSERT
+    await transaction_batcher.submit(
+        user_id,
+        {
+            "type": TransactionType.EXPENSE,
+            "currency": expense["currency"],
+            "amount": expense["amount"],
+            "date": datetime.fromisoformat(expense["date"]),
+            "description": f"{expense['merchant']} - {expense['note']}"
+            if expense["note"]
+            else expense["merchant"],
+        },
     )
 
-    # Create transaction in database
-    async with async_session_maker() as session:
-        # Get or create a default expense account
-        account = await AccountCRUD.get_or_create(
-            session=session,
-            user_id=user_id,
-            name="Default",
-            account_type=AccountType.WALLET,
-        )
-
-        # Create the transaction
-        await TransactionCRUD.create(
-            session=session,
+    # Update user memory with any changes. The row is already committed, so a
+    # failure here must not fail the confirmation and invite a second insert.
+    try:
+        await financial_agent.update_user_memory(
             user_id=user_id,
-            transaction_type=TransactionType.EXPENSE,
-            currency=expense["currency"],
-            amount=Decimal(str(expense["amount"])),
-            date=datetime.strptime(expense["date"], "%Y-%m-%d"),
-            account_from_id=account.id,
-            description=f"{expense['merchant']} - {expense['note']}"
-            if expense["note"]
-            else expense["merchant"],
+            merchant=expense["merchant"],
+            category=classification["category"],
+            is_necessary=classification["is_necessary"],
         )
+    except Exception as e:
+        logger.error("Error updating user memory for user %s: %s", user_id, e)
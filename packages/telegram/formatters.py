@@ -1,3 +1,4 @@
+from collections import defaultdict
 from typing import List
 
 from packages.agent.schemas import BalanceInfo, TransactionInfo
@@ -9,59 +10,53 @@ def format_balances_telegram(balances: List[BalanceInfo]) -> str:
         return "💰 No balances found."
 
     # Group by account
-    accounts = {}
+    accounts = defaultdict(list)
     for balance in balances:
-        if balance.account_name not in accounts:
-            accounts[balance.account_name] = []
         accounts[balance.account_name].append(balance)
 
-    lines = ["💰 <b>Account Balances:</b>", ""]
-    for account_name, account_balances in accounts.items():
-        if len(account_balances) == 1:
-            balance = account_balances[0]
-            lines.append(f"• {account_name} – {balance.currency} {balance.balance:,.2f}")
-        else:
-            currencies = []
-            for balance in account_balances:
-                currencies.append(f"{balance.currency} {balance.balance:,.2f}")
-            lines.append(f"• {account_name} – {', '.join(currencies)}")
+    return "💰 <b>Account Balances:</b>\n\n" + "\n".join(
+        f"• {account_name} – "
+        + ", ".join(f"{b.currency} {b.balance:,.2f}" for b in account_balances)
+        for account_name, account_balances in accounts.items()
+    )
 
-    return "\n".join(lines)
 
+_TRANSACTION_EMOJI = {"income": "💰", "expense": "💸", "transfer": "🔄", "conversion": "💱"}
 
-def format_transactions_telegram(transactions: List[TransactionInfo], title: str = "Transactions") -> str:
-    """Format transaction list for Telegram display."""
-    if not transactions:
-        return f"📋 No {title.lower()} found."
-
-    lines = [f"📋 <b>{title}:</b>", ""]
 
-    for t in transactions:
-        emoji = {"income": "💰", "expense": "💸", "transfer": "🔄", "conversion": "💱"}.get(t.type, "📝")
+def _format_transaction_line(t: TransactionInfo) -> str:
+    """Format a single transaction as one Telegram line."""
+    emoji = _TRANSACTION_EMOJI.get(t.type, "📝")
 
+    if t.account_from and t.account_to:
+        account_info = f" ({t.account_from} → {t.account_to})"
+    elif t.account_from:
+        account_info = f" from {t.account_from}"
+    elif t.account_to:
+        account_info = f" to {t.account_to}"
+    else:
         account_info = ""
-        if t.account_from and t.account_to:
-            account_info = f" ({t.account_from} → {t.account_to})"
-        elif t.account_from:
-            account_info = f" from {t.account_from}"
-        elif t.account_to:
-            account_info = f" to {t.account_to}"
 
-        date_str = t.date.strftime("%m/%d")
-        amount_str = f"{t.amount:,.2f} {t.currency}"
+    description = f" ({t.description})" if t.description else ""
+    return f"{emoji} {t.amount:,.2f} {t.currency}{account_info} - {t.date:%m/%d}{description}"
+
+
+def format_transactions_telegram(transactions: List[TransactionInfo], title: str = "Transactions") -> str:
+    """Format transaction list for Telegram display."""
+    if not transactions:
+        return f"📋 No {title.lower()} found."
 
-        line = f"{emoji} {amount_str}{account_info} - {date_str}"
-        if t.description:
-            line += f" ({t.description})"
+    return f"📋 <b>{title}:</b>\n\n" + "\n".join(
+        _format_transaction_line(t) for t in transactions
+    )
 
-        lines.append(line)
 
-    return "\n".join(lines)
+# Telegram MarkdownV2 special characters, each mapped to its escaped form
+_MARKDOWN_ESCAPES = str.maketrans(
+    {char: f'\\{char}' for char in '_*[]()~`>#+-=|{}.!'}
+)
 
 
 def escape_markdown(text: str) -> str:
     """Escape special characters for Telegram MarkdownV2."""
-    special_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-    for char in special_chars:
-        text = text.replace(char, f'\\{char}')
-    return text
+    return text.translate(_MARKDOWN_ESCAPES)
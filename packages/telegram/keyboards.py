@@ -6,11 +6,7 @@ from typing import List, Optional
 from libs.db.models import BalanceTrackingMode
 
 
-def build_main_settings_keyboard(user_balance_mode: str) -> InlineKeyboardMarkup:
-    """Build the main settings menu keyboard."""
-
-    balance_mode_display = "🔧 STRICT" if user_balance_mode == BalanceTrackingMode.STRICT else "📝 LOGGING"
-
+def _main_settings_markup(balance_mode_display: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(
             text=f"💰 Balance Tracking: {balance_mode_display}",
@@ -27,107 +23,131 @@ def build_main_settings_keyboard(user_balance_mode: str) -> InlineKeyboardMarkup
     ])
 
 
+def _confirmation_markup(mode: BalanceTrackingMode) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(
+            text=f"✅ Yes, switch to {mode.name}",
+            callback_data=f"confirm_balance_{mode.value}"
+        )],
+        [InlineKeyboardButton(
+            text="❌ Cancel",
+            callback_data="settings_balance"
+        )]
+    ])
+
+
+# The settings keyboards only vary by balance mode, so both variants of each
+# are built once at import and shared by every settings callback.
+_MAIN_SETTINGS_STRICT = _main_settings_markup("🔧 STRICT")
+_MAIN_SETTINGS_LOGGING = _main_settings_markup("📝 LOGGING")
+
+_BALANCE_SETTINGS_STRICT = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(
+        text="🔧 STRICT Mode ✅",
+        callback_data="balance_mode_info_strict"
+    )],
+    [InlineKeyboardButton(
+        text="• Prevents negative balances",
+        callback_data="noop"
+    )],
+    [InlineKeyboardButton(
+        text="• Enforces account limits",
+        callback_data="noop"
+    )],
+    [InlineKeyboardButton(
+        text="• Provides balance warnings",
+        callback_data="noop"
+    )],
+    [InlineKeyboardButton(
+        text="🔄 Switch to LOGGING Mode",
+        callback_data="balance_change_logging"
+    )],
+    [InlineKeyboardButton(
+        text="⬅️ Back to Settings",
+        callback_data="settings_main"
+    )]
+])
+_BALANCE_SETTINGS_LOGGING = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(
+        text="📝 LOGGING Mode ✅",
+        callback_data="balance_mode_info_logging"
+    )],
+    [InlineKeyboardButton(
+        text="• Allows any transaction amount",
+        callback_data="noop"
+    )],
+    [InlineKeyboardButton(
+        text="• Focuses on transaction recording",
+        callback_data="noop"
+    )],
+    [InlineKeyboardButton(
+        text="• No balance constraints",
+        callback_data="noop"
+    )],
+    [InlineKeyboardButton(
+        text="🔄 Switch to STRICT Mode",
+        callback_data="balance_change_strict"
+    )],
+    [InlineKeyboardButton(
+        text="⬅️ Back to Settings",
+        callback_data="settings_main"
+    )]
+])
+
+_CONFIRMATION_STRICT = _confirmation_markup(BalanceTrackingMode.STRICT)
+_CONFIRMATION_LOGGING = _confirmation_markup(BalanceTrackingMode.LOGGING)
+
+
+def build_main_settings_keyboard(user_balance_mode: str) -> InlineKeyboardMarkup:
+    """Build the main settings menu keyboard."""
+    if user_balance_mode == BalanceTrackingMode.STRICT:
+        return _MAIN_SETTINGS_STRICT
+    return _MAIN_SETTINGS_LOGGING
+
+
 def build_balance_settings_keyboard(current_mode: str) -> InlineKeyboardMarkup:
     """Build the balance tracking settings keyboard."""
-
     if current_mode == BalanceTrackingMode.STRICT:
-        # Currently in STRICT mode
-        return InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(
-                text="🔧 STRICT Mode ✅",
-                callback_data="balance_mode_info_strict"
-            )],
-            [InlineKeyboardButton(
-                text="• Prevents negative balances",
-                callback_data="noop"
-            )],
-            [InlineKeyboardButton(
-                text="• Enforces account limits",
-                callback_data="noop"
-            )],
-            [InlineKeyboardButton(
-                text="• Provides balance warnings",
-                callback_data="noop"
-            )],
-            [InlineKeyboardButton(
-                text="🔄 Switch to LOGGING Mode",
-                callback_data="balance_change_logging"
-            )],
-            [InlineKeyboardButton(
-                text="⬅️ Back to Settings",
-                callback_data="settings_main"
-            )]
-        ])
-    else:
-        # Currently in LOGGING mode
-        return InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(
-                text="📝 LOGGING Mode ✅",
-                callback_data="balance_mode_info_logging"
-            )],
-            [InlineKeyboardButton(
-                text="• Allows any transaction amount",
-                callback_data="noop"
-            )],
-            [InlineKeyboardButton(
-                text="• Focuses on transaction recording",
-                callback_data="noop"
-            )],
-            [InlineKeyboardButton(
-                text="• No balance constraints",
-                callback_data="noop"
-            )],
-            [InlineKeyboardButton(
-                text="🔄 Switch to STRICT Mode",
-                callback_data="balance_change_strict"
-            )],
-            [InlineKeyboardButton(
-                text="⬅️ Back to Settings",
-                callback_data="settings_main"
-            )]
-        ])
+        return _BALANCE_SETTINGS_STRICT
+    return _BALANCE_SETTINGS_LOGGING
 
 
 def build_confirmation_keyboard(new_mode: str) -> InlineKeyboardMarkup:
     """Build confirmation keyboard for balance mode changes."""
+    if new_mode == BalanceTrackingMode.STRICT:
+        return _CONFIRMATION_STRICT
+    return _CONFIRMATION_LOGGING
 
-    mode_name = "STRICT" if new_mode == BalanceTrackingMode.STRICT else "LOGGING"
 
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(
-            text=f"✅ Yes, switch to {mode_name}",
-            callback_data=f"confirm_balance_{new_mode}"
-        )],
-        [InlineKeyboardButton(
-            text="❌ Cancel",
-            callback_data="settings_balance"
-        )]
-    ])
+# track_balance -> row icon (True tracks, False logs, unset uses the default)
+_TRACK_STATUS = {True: "🔧", False: "📝"}
+
+_SHOW_MORE_ACCOUNTS_ROW = [InlineKeyboardButton(
+    text="➡️ Show More Accounts",
+    callback_data="accounts_page_2"
+)]
+_BACK_TO_SETTINGS_ROW = [InlineKeyboardButton(
+    text="⬅️ Back to Settings",
+    callback_data="settings_main"
+)]
 
 
 def build_account_settings_keyboard(accounts: List[dict]) -> InlineKeyboardMarkup:
     """Build keyboard for per-account settings."""
 
-    buttons = []
-
     # Add account rows
-    for account in accounts[:5]:  # Limit to 5 accounts for display
-        track_status = "🔧" if account.get('track_balance') is True else "📝" if account.get('track_balance') is False else "⚙️"
-        buttons.append([InlineKeyboardButton(
-            text=f"{track_status} {account['name']}",
+    buttons = [
+        [InlineKeyboardButton(
+            text=f"{_TRACK_STATUS.get(account.get('track_balance'), '⚙️')} {account['name']}",
             callback_data=f"account_toggle_{account['id']}"
-        )])
+        )]
+        for account in accounts[:5]  # Limit to 5 accounts for display
+    ]
 
     # Add navigation buttons
     if len(accounts) > 5:
-        buttons.append([InlineKeyboardButton(
-            text="➡️ Show More Accounts",
-            callback_data="accounts_page_2"
-        )])
+        buttons.append(_SHOW_MORE_ACCOUNTS_ROW)
 
-    buttons.append([InlineKeyboardButton(
-        text="⬅️ Back to Settings",
-        callback_data="settings_main"
-    )])
+    buttons.append(_BACK_TO_SETTINGS_ROW)
 
     return InlineKeyboardMarkup(inline_keyboard=buttons)
@@ -19,11 +19,17 @@ sys.path.insert(0, str(project_root))
 
 from packages.telegram.bot import dp, bot, setup_bot_commands
 
+# Optional: run the polling loop on uvloop when installed (the "speedups" extra)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+logger = logging.getLogger(__name__)
+
 
 async def start_bot():
     """Start the Telegram bot."""
-    logger = logging.getLogger(__name__)
-
     try:
         # Set up bot commands
         await setup_bot_commands()
@@ -34,7 +40,7 @@ async def start_bot():
         await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
 
     except Exception as e:
-        logger.error(f"❌ Failed to start bot: {e}")
+        logger.error("❌ Failed to start bot: %s", e)
         raise
     finally:
         await bot.session.close()
@@ -42,13 +48,6 @@ async def start_bot():
 
 async def main():
     """Main entry point."""
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-
-    logger = logging.getLogger(__name__)
     logger.info("🚀 Initializing Telegram Bot...")
 
     try:
@@ -56,9 +55,18 @@ async def main():
     except KeyboardInterrupt:
         logger.info("👋 Bot stopped by user")
     except Exception as e:
-        logger.error(f"❌ Bot crashed: {e}")
+        logger.error("❌ Bot crashed: %s", e)
         raise
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Configure logging before the loop starts. bot.py already called
+    # basicConfig at import, so force replaces its bare handler with this format.
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        force=True,
+    )
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(main())
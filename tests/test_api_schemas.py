@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from packages.api.src.schemas import account_list_out, encoder
+
+
+def _orjson_default(obj):
+    if isinstance(obj, Decimal):
+        return orjson.Fragment(str(obj))
+    raise TypeError
+
+
+def _orjson_accounts(accounts, include_balances):
+    """The /accounts body as it was encoded with orjson before the Structs."""
+    return orjson.dumps({
+        "accounts": [
+            {
+                "id": account.id,
+                "name": account.name,
+                "type": account.type,
+                "track_balance": account.track_balance,
+                "created_at": account.created_at,
+                **({
+                    "balances": [
+                        {
+                            "currency": balance.currency,
+                            "balance": balance.balance,
+                            "updated_at": balance.updated_at,
+                        }
+                        for balance in account.balances
+                    ]
+                } if include_balances else {}),
+            }
+            for account in accounts
+        ],
+        "count": len(accounts),
+    }, default=_orjson_default)
+
+
+@pytest.fixture
+def accounts():
+    return [
+        SimpleNamespace(
+            id=1,
+            name="Default",
+            type="wallet",
+            track_balance=None,
+            created_at=datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc),
+            balances=[
+                SimpleNamespace(
+                    currency="USD",
+                    balance=Decimal("1950.00000000"),
+                    updated_at=datetime(2024, 3, 14, 9, 30, 15, 250000, tzinfo=timezone.utc),
+                ),
+                SimpleNamespace(
+                    currency="ARS",
+                    balance=Decimal("-0.00000001"),
+                    updated_at=datetime(
+                        2024, 3, 14, 6, 30, tzinfo=timezone(timedelta(hours=-3))
+                    ),
+                ),
+            ],
+        ),
+        SimpleNamespace(
+            id=2,
+            name="Test Checking",
+            type="bank",
+            track_balance=True,
+            created_at=datetime(2024, 2, 29, 23, 59, 59, 999999, tzinfo=timezone.utc),
+            balances=[],
+        ),
+    ]
+
+
+@pytest.mark.parametrize("include_balances", [True, False])
+def test_accounts_body_matches_orjson(accounts, include_balances):
+    """Test the Struct-encoded /accounts body is byte for byte the orjson one."""
+    body = encoder.encode(account_list_out(accounts, include_balances))
+
+    assert body == _orjson_accounts(accounts, include_balances)
+    assert b"+00:00" in body
@@ -0,0 +1,178 @@
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from packages.telegram import financial_agent_handlers as handlers
+
+
+class FakeSession:
+    def __init__(self):
+        self.rolled_back = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Replace the session and CRUD helpers the batcher writes through."""
+    calls = []
+    failing_users = set()
+
+    async def get_or_create(session, user_id, name, account_type):
+        return SimpleNamespace(id=user_id * 10)
+
+    async def create_many(session, rows):
+        calls.append(rows)
+        if any(row["user_id"] in failing_users for row in rows):
+            raise RuntimeError("insert failed")
+        return list(range(len(rows)))
+
+    monkeypatch.setattr(handlers, "async_session_maker", FakeSession)
+    monkeypatch.setattr(handlers, "AccountCRUD", SimpleNamespace(get_or_create=get_or_create))
+    monkeypatch.setattr(handlers, "TransactionCRUD", SimpleNamespace(create_many=create_many))
+    return SimpleNamespace(calls=calls, failing_users=failing_users)
+
+
+@pytest.mark.asyncio
+async def test_batcher_writes_all_submits_in_one_insert(fake_db):
+    """Test concurrent submits share a single create_many."""
+    batcher = handlers.TransactionWriteBatcher(flush_seconds=0)
+
+    await asyncio.gather(
+        batcher.submit(1, {"description": "coffee"}),
+        batcher.submit(2, {"description": "lunch"}),
+        batcher.submit(1, {"description": "taxi"}),
+    )
+
+    assert len(fake_db.calls) == 1
+    assert sorted(row["description"] for row in fake_db.calls[0]) == ["coffee", "lunch", "taxi"]
+    for row in fake_db.calls[0]:
+        assert row["account_from_id"] == row["user_id"] * 10
+
+
+@pytest.mark.asyncio
+async def test_batcher_isolates_failing_user(fake_db):
+    """Test a failing user's write doesn't fail the other submits in the batch."""
+    fake_db.failing_users.add(2)
+    batcher = handlers.TransactionWriteBatcher(flush_seconds=0)
+
+    results = await asyncio.gather(
+        batcher.submit(1, {"description": "coffee"}),
+        batcher.submit(2, {"description": "lunch"}),
+        batcher.submit(3, {"description": "taxi"}),
+        return_exceptions=True,
+    )
+
+    assert results[0] is None
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] is None
+    # The batched insert, then one retry per user
+    assert len(fake_db.calls) == 4
+
+
+CONFIRMATION_ID = "123456789_a_b-Cd1x"
+
+
+@pytest.mark.parametrize("language", ["en", "es"])
+def test_confirmation_keyboard_callbacks_parse(language):
+    """Test every confirmation button's callback data maps back to its action."""
+    keyboard = handlers._build_expense_confirmation_keyboard(
+        CONFIRMATION_ID, {"resolved_language": language}
+    )
+
+    buttons = [button for row in keyboard.inline_keyboard for button in row]
+    assert buttons
+    for button in buttons:
+        match = handlers._CALLBACK_RE.fullmatch(button.callback_data)
+        assert match is not None
+        assert match["category"] is None
+        assert match["action"] in handlers._CALLBACK_ACTIONS
+        assert match["confirmation_id"] == CONFIRMATION_ID
+
+
+@pytest.mark.parametrize(
+    "category, expected",
+    [
+        ("Groceries", "Groceries"),
+        ("Food and Dining", "Food_and_Dining"),
+        ("Health_Care", "Health_Care"),
+        ("Gift_2024_x", "Gift_2024_x"),
+        ("Rent 2024_12_abcdefgh", "Rent_2024_12_abcdefgh"),
+    ],
+)
+def test_category_keyboard_callbacks_parse(category, expected):
+    """Test category picks keep their underscores and the back button parses."""
+    keyboard = handlers._build_category_selection_keyboard(
+        CONFIRMATION_ID, [{"category": category}]
+    )
+
+    setcat, back = (row[0].callback_data for row in keyboard.inline_keyboard)
+    match = handlers._CALLBACK_RE.fullmatch(setcat)
+    assert match is not None
+    assert match["action"] is None
+    assert match["category"] == expected
+    assert match["confirmation_id"] == CONFIRMATION_ID
+
+    match = handlers._CALLBACK_RE.fullmatch(back)
+    assert match is not None
+    assert match["action"] == "back"
+    assert match["confirmation_id"] == CONFIRMATION_ID
+
+
+def test_category_callback_with_digit_token():
+    """Test a token made of digits and underscores doesn't move the id split."""
+    confirmation_id = "42_1_234_56"
+    match = handlers._CALLBACK_RE.fullmatch(
+        f"expense_setcatGift_2024_x_{confirmation_id}"
+    )
+
+    assert match is not None
+    assert match["category"] == "Gift_2024_x"
+    assert match["confirmation_id"] == confirmation_id
+
+
+def test_unknown_callback_action_falls_through():
+    """Test an unknown action parses but has no handler."""
+    match = handlers._CALLBACK_RE.fullmatch(f"expense_refund_{CONFIRMATION_ID}")
+
+    assert match is not None
+    assert match["category"] is None
+    assert match["action"] == "refund"
+    assert match["action"] not in handlers._CALLBACK_ACTIONS
+
+
+@pytest.mark.parametrize("merchant, note", [("Starbucks", "latte"), (None, None)])
+def test_confirmation_pack_round_trip(merchant, note):
+    """Test a pending confirmation survives packing and orjson encoding."""
+    pending = {
+        "user_id": 123456789,
+        "confirmation": {
+            "resolved_language": "es",
+            "expense": {
+                "amount": Decimal("1234.50"),
+                "currency": "ARS",
+                "merchant": merchant,
+                "note": note,
+                "date": "2025-03-14",
+            },
+            "classification": {
+                "category": "Food and Dining",
+                "is_necessary": False,
+                "confidence": 0.87,
+                "alternatives": [{"category": "Groceries"}, {"category": "Entertainment"}],
+            },
+        },
+    }
+
+    assert handlers._unpack(handlers._pack(pending)) == pending
+    assert handlers._unpack(orjson.loads(orjson.dumps(handlers._pack(pending)))) == pending